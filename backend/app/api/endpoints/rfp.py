@@ -1,44 +1,63 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from typing import List
+from typing import List, Union
+import asyncio
+import time
 import uuid
-from app.models.rfp import ProcessingStatus, RFPResponse
+from app.models.rfp import ProcessingStatus, RFPResponse, RepriceRequest
+from app.services.upload_spool import UploadSpool
+from app.services.agent_registry import agents
+from app.services.opportunity_scanner import opportunity_scanner
 
 router = APIRouter()
 
 # In-memory storage for MVP
 jobs = {}
+upload_spool = UploadSpool()
 
-def process_rfp_task(job_id: str, file_content: bytes):
+def process_rfp_task(job_id: str, source: Union[str, bytes]):
+    """
+    `source` is the spooled PDF path for uploads, or simulated bytes for the demo pipelines.
+    """
     jobs[job_id]["status"] = "processing"
     jobs[job_id]["stage"] = "technical_agent"
     jobs[job_id]["progress"] = 10
     jobs[job_id]["message"] = "Technical Agent: Parsing PDF and extracting requirements..."
     
     try:
-        from app.services.technical_agent import TechnicalAgent
-        from app.services.pricing_agent import PricingAgent
-        
         # 1. Technical Analysis
-        tech_agent = TechnicalAgent()
-        tech_result = tech_agent.process_rfp(file_content)
+        tech_agent = agents.get_technical_agent()
+        tech_result = tech_agent.process_rfp(source)
+        
+        # Token accounting for sizing Groq rate limits and spotting runaway RFPs
+        jobs[job_id]["token_usage"] = tech_result.get("extraction_stats", {}).get("token_usage")
         
         jobs[job_id]["progress"] = 50
         jobs[job_id]["stage"] = "pricing_agent"
         jobs[job_id]["message"] = "Pricing Agent: Calculating BOM and Commercials..."
         
         # 2. Pricing Calculation
-        pricing_agent = PricingAgent()
-        final_result = pricing_agent.calculate_pricing(tech_result)
+        pricing_agent = agents.get_pricing_agent()
+        final_result, pricing_table = pricing_agent.price(tech_result)
+        
+        # Kept so what-if scenarios can be re-priced without re-running the technical analysis
+        jobs[job_id]["technical_result"] = tech_result
+        jobs[job_id]["pricing_table"] = pricing_table
         
         jobs[job_id]["status"] = "completed"
         jobs[job_id]["stage"] = "completed"
         jobs[job_id]["progress"] = 100
-        jobs[job_id]["message"] = "Analysis Complete."
+        failed_chunks = tech_result.get("extraction_stats", {}).get("llm_chunks_failed", 0)
+        jobs[job_id]["message"] = (f"Analysis Complete. {failed_chunks} text chunk(s) failed extraction; "
+                                   "line items may be missing.") if failed_chunks else "Analysis Complete."
         jobs[job_id]["result"] = final_result
         
     except Exception as e:
         jobs[job_id]["status"] = "failed"
         jobs[job_id]["message"] = str(e)
+    finally:
+        # Uploads are spooled per job; the demo pipelines pass bytes and spool nothing
+        if isinstance(source, str):
+            upload_spool.release(source)
 
 @router.post("/upload", response_model=ProcessingStatus)
 async def upload_rfp(
@@ -50,19 +69,20 @@ async def upload_rfp(
 
     job_id = str(uuid.uuid4())
     
-    # Read file content (in real app, save to disk/S3)
-    content = await file.read()
+    # Stream the upload to the spool directory; only the path travels with the job
+    file_path = await upload_spool.save(file)
     
     # Initialize Job
     jobs[job_id] = {
         "id": job_id,
         "status": "queued",
         "progress": 0,
-        "filename": file.filename
+        "filename": file.filename,
+        "file_path": file_path
     }
     
     # Trigger Background Task
-    background_tasks.add_task(process_rfp_task, job_id, content)
+    background_tasks.add_task(process_rfp_task, job_id, file_path)
     
     return ProcessingStatus(
         job_id=job_id,
@@ -82,7 +102,8 @@ async def get_status(job_id: str):
         status=job["status"],
         stage=job.get("stage"),
         progress=job["progress"],
-        message=job.get("message")
+        message=job.get("message"),
+        token_usage=job.get("token_usage")
     )
 
 @router.get("/{job_id}/result")
@@ -96,7 +117,37 @@ async def get_result(job_id: str):
         
     if job["status"] != "completed":
         raise HTTPException(status_code=400, detail=f"Job still processing (Status: {job['status']}). Progress: {job['progress']}%")
-        
+
+    return job["result"]
+
+@router.post("/{job_id}/reprice")
+async def reprice_job(job_id: str, delta: RepriceRequest):
+    """
+    What-if re-pricing: applies a delta (margin, tax rate, add-ons, quantities)
+    to a completed job's quote. Only affected lines are re-priced and the job's
+    result is updated in place. Runs inline, so scenarios on one job apply in order.
+    """
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job = jobs[job_id]
+    if job["status"] != "completed" or "pricing_table" not in job:
+        raise HTTPException(status_code=400, detail=f"Job has no priced result to re-price (Status: {job['status']}).")
+
+    t0 = time.perf_counter()
+    try:
+        rows = agents.get_pricing_agent().reprice(job["result"], job["pricing_table"], delta.dict())
+    except IndexError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    line_items = job["result"]["line_items"]
+    return {
+        "job_id": job_id,
+        "changed_lines": [{"index": i, "pricing": line_items[i]["pricing"]} for i in rows],
+        "commercial_summary": job["result"]["commercial_summary"],
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 3)
+    }
+
 @router.post("/pipeline/run-auto")
 async def run_full_pipeline_auto(background_tasks: BackgroundTasks):
     """
@@ -104,11 +155,10 @@ async def run_full_pipeline_auto(background_tasks: BackgroundTasks):
     1. Sales Agent Scans & Selects Top 1.
     2. Main Agent (Orchestrator) triggers processing for it.
     """
-    from app.services.sales_agent import SalesAgent
-    sales_agent = SalesAgent()
+    sales_agent = agents.get_sales_agent()
     
     # 1. Scan & Select
-    scan_result = sales_agent.scan_for_rfps()
+    scan_result = await opportunity_scanner.latest()
     valid_opps = scan_result.get("opportunities", [])
     
     if not valid_opps:
@@ -148,20 +198,17 @@ async def run_full_pipeline_auto(background_tasks: BackgroundTasks):
 @router.post("/pipeline/magic-run")
 async def run_pipeline_sync():
     """
-    MAGIC ENDPOINT: Does EVERYTHING in one go (Blocking).
+    MAGIC ENDPOINT: Does EVERYTHING in one go.
+    The request waits for the full result, but the work runs off the event loop.
     1. Scan sales.
     2. Pick best RPF.
     3. Analyze it.
     4. Price it.
     5. Return FULL RESULT.
     """
-    from app.services.sales_agent import SalesAgent
-    from app.services.technical_agent import TechnicalAgent
-    from app.services.pricing_agent import PricingAgent
-    
     # 1. Sales Scan
-    sales_agent = SalesAgent()
-    scan_result = sales_agent.scan_for_rfps()
+    sales_agent = agents.get_sales_agent()
+    scan_result = await opportunity_scanner.latest()
     valid_opps = scan_result.get("opportunities", [])
     if not valid_opps: return {"error": "No opportunities found"}
     
@@ -172,12 +219,12 @@ async def run_pipeline_sync():
     # Using dummy content since we can't auth to gov site
     dummy_content = b"Simulated PDF Content for " + best_rfp['title'].encode()
     
-    tech_agent = TechnicalAgent()
-    tech_result = tech_agent.process_rfp(dummy_content)
+    tech_agent = agents.get_technical_agent()
+    tech_result = await tech_agent.aprocess_rfp(dummy_content)
     
     # 4. Pricing
-    pricing_agent = PricingAgent()
-    final_result = pricing_agent.calculate_pricing(tech_result)
+    pricing_agent = agents.get_pricing_agent()
+    final_result = await pricing_agent.acalculate_pricing(tech_result)
     
     # 5. Return EVERYTHING
     return {
@@ -185,3 +232,13 @@ async def run_pipeline_sync():
         "technical_analysis": tech_result,
         "commercial_quote": final_result
     }
+
+@router.post("/catalog/reload")
+async def reload_catalog():
+    """
+    Reopens the product catalog in the shared agents after the catalog has changed.
+    """
+    # Reopening Chroma and loading the embedding model block, so keep them off the event loop
+    if not await asyncio.to_thread(agents.reload_catalog):
+        raise HTTPException(status_code=500, detail="Vector DB failed to reload")
+    return {"message": "Product catalog reloaded."}
@@ -1,25 +1,27 @@
 from fastapi import APIRouter
 from typing import List
-from app.services.sales_agent import SalesAgent
+from app.services.opportunity_scanner import opportunity_scanner
 
 router = APIRouter()
-sales_agent = SalesAgent()
 
 @router.post("/scan")
 async def scan_web_for_rfps():
     """
-    Triggers the Sales Agent to scan target URLs.
+    Triggers the Sales Agent to scan target URLs now and refreshes the cached snapshot.
     """
-    opportunities = sales_agent.scan_for_rfps()
+    opportunities = await opportunity_scanner.refresh()
     return {
         "message": "Scanning completed successfully",
         "found_opportunities": opportunities.get("opportunities_found", 0),
-        "opportunities": opportunities
+        "opportunities": opportunities,
+        "cache": opportunity_scanner.cache_info()
     }
 
 @router.get("/opportunities")
 async def get_opportunities():
     """
     Get the list of currently identified opportunities.
+    Served from the latest background scan; see `cache` for its age and staleness.
     """
-    return sales_agent.scan_for_rfps()
+    snapshot = await opportunity_scanner.latest()
+    return {**snapshot, "cache": opportunity_scanner.cache_info()}
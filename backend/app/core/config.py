@@ -17,14 +17,78 @@ class Settings(BaseSettings):
             return v
         raise ValueError(v)
 
-    # Database
-    # SQLALCHEMY_DATABASE_URI: str = "sqlite:///./sql_app.db"
+    # Database (price book)
+    SQLALCHEMY_DATABASE_URI: str = "sqlite:///./sql_app.db"
+    PRICE_BOOK_CACHE_SIZE: int = 100000  # Cached (SKU, date) lookups, least recently used evicted first
+    PRICE_BOOK_VERSION_CHECK_SECONDS: float = 5.0  # How stale another process's price change may be
     
     # LLM Keys
     OPENAI_API_KEY: str = ""
     GOOGLE_API_KEY: str = ""
     GROQ_API_KEY: str = ""
 
+    # Chunked (map-reduce) requirement extraction
+    LLM_CHUNK_CHARS: int = 12000
+    LLM_CHUNK_OVERLAP_CHARS: int = 800
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_CHUNK_TIMEOUT_SECONDS: float = 60.0
+
+    # Persistent cache of raw LLM responses per chunk
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./llm_cache/responses.sqlite3"
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Token accounting; 0 disables the per-job budget
+    LLM_TOKEN_BUDGET_PER_JOB: int = 200000
+    LLM_COMPLETION_TOKENS_RESERVE: int = 1500  # Expected completion size per call when planning
+    LLM_MIN_CHUNK_TOKENS: int = 500  # Don't bother sending a trimmed chunk smaller than this
+    LLM_TOKENIZER_ENCODING: str = "cl100k_base"
+
+    # Vector search backend: "chroma" (query the collection), "numpy" (in-process exact index)
+    # or "ivf" (in-process approximate index with quantized codes, for very large catalogs)
+    VECTOR_BACKEND: str = "chroma"
+    IVF_N_LISTS: int = 0  # 0 = about 4 * sqrt(catalog size)
+    IVF_NPROBE: int = 8  # Lists scanned per query; higher = better recall, slower
+    IVF_CODE_DTYPE: str = "int8"  # "int8" (4x smaller than float32) or "float16" (2x)
+    IVF_TRAIN_SIZE: int = 50000  # Vectors sampled to train the list centroids
+    VECTOR_PREFILTER: bool = True  # Narrow each search by category / voltage band / insulation
+
+    # Tender portal fetching (Sales Agent)
+    PORTAL_FETCH_TIMEOUT: float = 10.0  # Seconds per request, unless overridden per source
+    PORTAL_FETCH_RETRIES: int = 2
+    PORTAL_FETCH_DEADLINE: float = 30.0  # Seconds per source across all attempts and backoff, unless overridden
+    PORTAL_RETRY_BACKOFF: float = 0.5  # Seconds before the first retry, doubled each time
+    PORTAL_MAX_PER_HOST: int = 2  # Concurrent requests to any one portal
+    PORTAL_MAX_CONNECTIONS: int = 20  # Pooled connections across all portals
+
+    # Tender listing parser: "auto" (lxml if installed), "lxml" (iterparse) or "strainer" (bs4 SoupStrainer)
+    TENDER_PARSER_BACKEND: str = "auto"
+
+    # Background opportunity scanning
+    OPPORTUNITY_SCANNER_ENABLED: bool = True
+    OPPORTUNITY_SCAN_INTERVAL_SECONDS: float = 4 * 3600
+    OPPORTUNITY_CACHE_TTL_SECONDS: float = 4.5 * 3600  # One interval plus slack for a slow scan
+
+    # Bulk catalog ingestion (ingest_catalog.py)
+    CATALOG_INGEST_BATCH_SIZE: int = 500  # Rows embedded and upserted per batch
+    CATALOG_INGEST_WORKERS: int = 4  # Batches embedded concurrently
+
+    # PDF Extraction
+    PDF_PARALLEL_MIN_PAGES: int = 200  # Documents at or above this size are extracted in a process pool
+    PDF_MAX_WORKERS: int = 0  # 0 = use os.cpu_count()
+
+    # Uploads are streamed to disk under their SHA-256 instead of being held in memory
+    UPLOAD_SPOOL_DIR: str = "./uploaded_rfps"
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+
+    # OCR for pages without a text layer (needs tesseract-ocr and poppler-utils installed)
+    OCR_ENABLED: bool = True
+    OCR_MIN_PAGE_CHARS: int = 20  # Pages with less extractable text than this are OCR'd
+    OCR_MAX_WORKERS: int = 2
+    OCR_DPI: int = 300
+    OCR_LANG: str = "eng"
+    OCR_CACHE_DIR: str = "./ocr_cache"
+
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env")
 
 settings = Settings()
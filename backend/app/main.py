@@ -1,11 +1,29 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.endpoints import rfp, sales
+from app.services.agent_registry import agents
+from app.services.opportunity_scanner import opportunity_scanner
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the LLM client, vector DB and agents once per worker process
+    await asyncio.to_thread(agents.startup)
+    # Portal scans run on an interval; /sales/opportunities serves the cached snapshot
+    if settings.OPPORTUNITY_SCANNER_ENABLED:
+        opportunity_scanner.start()
+    yield
+    await opportunity_scanner.stop()
+    if agents.sales_agent is not None:
+        await agents.sales_agent.aclose()
+    agents.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Dict, Optional
 from datetime import datetime
 
 class RFPBase(BaseModel):
@@ -23,3 +23,21 @@ class ProcessingStatus(BaseModel):
     stage: Optional[str] = None
     progress: int
     message: Optional[str] = None
+    token_usage: Optional[Dict] = None
+
+# Margins are fractions of the unit price; -1 (-100%) or below would price a line at or under zero
+Quantity = Annotated[float, Field(gt=0)]
+Margin = Annotated[float, Field(gt=-1)]
+AddOn = Annotated[float, Field(ge=0)]
+
+class RepriceRequest(BaseModel):
+    """
+    What-if delta for a priced job. Quote-wide fields apply to every line;
+    per-line fields map a line index to its new value.
+    """
+    tax_rate: Optional[float] = Field(default=None, ge=0)
+    margin: Optional[Margin] = None
+    service_add_on: Optional[AddOn] = None
+    quantities: Optional[Dict[int, Quantity]] = None
+    line_margins: Optional[Dict[int, Margin]] = None
+    line_add_ons: Optional[Dict[int, AddOn]] = None
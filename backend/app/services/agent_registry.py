@@ -0,0 +1,87 @@
+import copy
+import threading
+from typing import Optional
+from app.services.vector_store import ProductVectorDB
+from app.services.technical_agent import TechnicalAgent
+from app.services.pricing_agent import PricingAgent
+from app.services.sales_agent import SalesAgent
+
+
+class AgentRegistry:
+    """
+    Process-wide agents, built once in the FastAPI lifespan hook and shared by
+    every request. Building them per job meant a new ChatGroq client, a new
+    Chroma PersistentClient and an embedding model reload each time.
+    Each uvicorn worker process gets its own registry.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.vector_db: Optional[ProductVectorDB] = None
+        self.technical_agent: Optional[TechnicalAgent] = None
+        self.pricing_agent: Optional[PricingAgent] = None
+        self.sales_agent: Optional[SalesAgent] = None
+
+    @property
+    def started(self) -> bool:
+        return self.technical_agent is not None
+
+    def startup(self):
+        with self._lock:
+            if self.started:
+                return
+            print("DEBUG: Building shared agents...")
+            self.vector_db = self._load_vector_db()
+            self.technical_agent = TechnicalAgent(vector_db=self.vector_db)
+            self.pricing_agent = PricingAgent()
+            self.sales_agent = SalesAgent()
+
+    def shutdown(self):
+        with self._lock:
+            self.technical_agent = None
+            self.pricing_agent = None
+            self.sales_agent = None
+            self.vector_db = None
+
+    def reload_catalog(self) -> bool:
+        """
+        Reopens the product catalog (e.g. after seed_db.py or a catalog import)
+        and publishes a TechnicalAgent bound to it. The agent is a shallow copy
+        sharing the LLM clients and response cache; jobs already running hold
+        the previous agent, so they finish against the catalog they started with.
+        """
+        vector_db = self._load_vector_db()
+        if vector_db is None:
+            return False
+        with self._lock:
+            self.vector_db = vector_db
+            if self.technical_agent is not None:
+                technical_agent = copy.copy(self.technical_agent)
+                technical_agent.vector_db = vector_db
+                self.technical_agent = technical_agent
+        return True
+
+    @staticmethod
+    def _load_vector_db() -> Optional[ProductVectorDB]:
+        try:
+            vector_db = ProductVectorDB()
+            print("DEBUG: ChromaDB Vector Store initialized.")
+            return vector_db
+        except Exception as e:
+            print(f"WARNING: Vector DB failed to load: {e}")
+            return None
+
+    # Accessors start the registry lazily so scripts can use it without the app lifespan
+    def get_technical_agent(self) -> TechnicalAgent:
+        self.startup()
+        return self.technical_agent
+
+    def get_pricing_agent(self) -> PricingAgent:
+        self.startup()
+        return self.pricing_agent
+
+    def get_sales_agent(self) -> SalesAgent:
+        self.startup()
+        return self.sales_agent
+
+
+agents = AgentRegistry()
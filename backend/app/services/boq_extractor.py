@@ -0,0 +1,130 @@
+import re
+from typing import List, Dict, Optional
+from app.services.pdf_processor import PDFDocument
+from app.services.spec_parser import parse_specs
+
+# Header cell keywords used to recognise a BOQ table and map its columns
+COLUMN_KEYWORDS = {
+    "item_no": ["s.no", "s. no", "sl", "sr", "item no", "item code", "no."],
+    "description": ["description", "particulars", "name of item", "item description", "specification", "material"],
+    "unit": ["unit", "uom", "u.o.m"],
+    "quantity": ["qty", "quantity", "quantities"],
+}
+
+NUMBER_RE = re.compile(r"-?\d[\d,]*(?:\.\d+)?")
+# Summary rows that carry no item of their own
+TOTAL_RE = re.compile(r"^\s*(?:sub[\s-]*total|grand\s+total|total|carried\s+(?:forward|over)|brought\s+forward)\b",
+                      re.IGNORECASE)
+
+
+def parse_quantity(text: Optional[str]) -> Optional[float]:
+    if not text:
+        return None
+    m = NUMBER_RE.search(text)
+    if not m:
+        return None
+    try:
+        return float(m.group(0).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _clean(cell: Optional[str]) -> str:
+    return " ".join((cell or "").split())
+
+
+def _map_columns(header: List[str]) -> Dict[str, int]:
+    columns = {}
+    for idx, cell in enumerate(header):
+        label = _clean(cell).lower()
+        if not label:
+            continue
+        for field, keywords in COLUMN_KEYWORDS.items():
+            if field not in columns and any(label.startswith(kw) or kw in label for kw in keywords):
+                columns[field] = idx
+                break
+    return columns
+
+
+class BOQExtractor:
+    """
+    Deterministic fast path for tabular Bills of Quantities. Uses PyMuPDF table
+    detection and turns each row into the requirement dict `_find_best_match`
+    consumes. Rows it cannot resolve are handed back as text for the LLM.
+    """
+    def __init__(self):
+        self.items: List[Dict] = []
+        self.unresolved_rows: List[str] = []
+        self.tables_found = 0
+
+    @classmethod
+    def extract(cls, document: PDFDocument, pages: Optional[List[int]] = None) -> "BOQExtractor":
+        extractor = cls()
+        pages = range(document.page_count) if not pages else pages
+        for page_no in pages:
+            # Pages from OCR have no vector table structure to detect
+            if page_no in document.ocr_pages:
+                continue
+            try:
+                tables = document.page(page_no).find_tables().tables
+            except Exception as e:
+                print(f"WARNING: Table detection failed on page {page_no + 1}: {e}")
+                continue
+            for table in tables:
+                extractor._parse_table(table.extract())
+        return extractor
+
+    def _parse_table(self, rows: List[List[Optional[str]]]):
+        if not rows:
+            return
+        # The header is usually the first row, occasionally the second (under a title row)
+        header_idx, columns = None, {}
+        for idx in range(min(2, len(rows))):
+            columns = _map_columns(rows[idx])
+            if "description" in columns and "quantity" in columns:
+                header_idx = idx
+                break
+        if header_idx is None:
+            return
+
+        self.tables_found += 1
+        heading = ""
+        for row in rows[header_idx + 1:]:
+            cells = [_clean(c) for c in row]
+            if not any(cells):
+                continue
+            # Header repeated after a page break
+            if _map_columns(row) == columns:
+                continue
+            description = cells[columns["description"]] if columns["description"] < len(cells) else ""
+            qty_cell = cells[columns["quantity"]] if columns["quantity"] < len(cells) else ""
+            unit = cells[columns["unit"]] if "unit" in columns and columns["unit"] < len(cells) else ""
+            item_no = cells[columns["item_no"]] if "item_no" in columns and columns["item_no"] < len(cells) else ""
+            quantity = parse_quantity(qty_cell)
+            if TOTAL_RE.match(description) or (not description and any(TOTAL_RE.match(c) for c in cells)):
+                continue
+
+            if description and quantity is not None:
+                item = {
+                    "name": description,
+                    "quantity": quantity,
+                    "specs": parse_specs(description)
+                }
+                if unit:
+                    item["unit"] = unit
+                self.items.append(item)
+            elif description and (unit or item_no or qty_cell):
+                # A partial item: merged cells, quantities spelled out, "as per drawing" etc.
+                # Sent with its section heading, which often carries the specs.
+                row_text = " | ".join(c for c in cells if c)
+                self.unresolved_rows.append(f"{heading} | {row_text}" if heading else row_text)
+            elif description and not description.lower().startswith("note"):
+                # Section headings are context for the rows under them, not items
+                heading = description
+
+    def stats(self) -> Dict:
+        return {
+            "tables_found": self.tables_found,
+            "table_items": len(self.items),
+            "unresolved_rows": len(self.unresolved_rows)
+        }
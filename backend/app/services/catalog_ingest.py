@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+from app.core.config import settings
+from app.services.vector_store import ProductVectorDB
+
+# Product fields taken as-is from a catalog row; everything else is a spec
+PRODUCT_FIELDS = ("sku", "name", "details", "category", "price")
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv", ".tsv"):
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Unsupported catalog format: {ext} (expected .csv, .jsonl or .parquet)")
+
+
+def iter_catalog_rows(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Streams raw rows from a CSV, JSONL or Parquet catalog without loading the file.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            dialect = "excel-tab" if path.lower().endswith(".tsv") else "excel"
+            yield from csv.DictReader(f, dialect=dialect)
+    elif fmt == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet catalogs need pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=settings.CATALOG_INGEST_BATCH_SIZE):
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unsupported catalog format: {fmt}")
+
+
+def row_to_product(row: Dict) -> Optional[Dict]:
+    """
+    Maps a catalog row onto the seed_db.py product schema. Specs come from a
+    JSON `specs` column and/or flat `spec_<name>` / `specs.<name>` columns.
+    Rows without a SKU or name are skipped.
+    """
+    sku = str(row.get("sku") or "").strip()
+    name = str(row.get("name") or "").strip()
+    if not sku or not name:
+        return None
+
+    specs = row.get("specs") or {}
+    if isinstance(specs, str):
+        try:
+            specs = json.loads(specs)
+        except ValueError:
+            specs = {}
+    specs = dict(specs)
+    for key, value in row.items():
+        for prefix in ("spec_", "specs."):
+            if key.startswith(prefix) and value not in (None, ""):
+                specs[key[len(prefix):]] = value
+
+    try:
+        price = float(row.get("price") or 0)
+    except (TypeError, ValueError):
+        price = 0.0
+
+    return {
+        "sku": sku,
+        "name": name,
+        "details": str(row.get("details") or ""),
+        "category": str(row.get("category") or ""),
+        "price": price,
+        "specs": specs
+    }
+
+
+class CatalogIngestor:
+    """
+    Streaming bulk loader for large OEM catalogs. Rows are read in chunks,
+    batches are embedded in parallel worker threads (the embedding backends
+    release the GIL or wait on the network) and upserted in order, in bounded
+    batches. Progress is checkpointed after every upsert so an interrupted
+    load resumes where it stopped; the checkpoint is removed once the whole
+    file has been ingested.
+    """
+    def __init__(self, db: ProductVectorDB, batch_size: int = None, workers: int = None,
+                 checkpoint_path: str = None):
+        self.db = db
+        self.batch_size = batch_size or settings.CATALOG_INGEST_BATCH_SIZE
+        self.workers = workers or settings.CATALOG_INGEST_WORKERS
+        self.checkpoint_path = checkpoint_path
+
+    _SIGNATURE_KEYS = ("source", "size", "mtime", "db_path", "collection")
+
+    def _source_signature(self, path: str) -> Dict:
+        """
+        Identifies the catalog file and the collection it is loaded into, so a
+        checkpoint is never resumed against a different file or target DB.
+        """
+        stat = os.stat(path)
+        return {"source": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime,
+                "db_path": self.db.path, "collection": self.db.collection.name}
+
+    def _load_checkpoint(self, path: str) -> int:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if {k: checkpoint.get(k) for k in self._SIGNATURE_KEYS} != self._source_signature(path):
+            print("WARNING: Checkpoint is for a different catalog file or target collection, starting over.")
+            return 0
+        return int(checkpoint.get("rows_done", 0))
+
+    def _save_checkpoint(self, path: str, rows_done: int):
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({**self._source_signature(path), "rows_done": rows_done}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _batches(self, path: str, fmt: Optional[str], skip_rows: int) -> Iterator[tuple]:
+        """
+        Yields (rows_consumed, products) per batch, skipping rows already ingested.
+        """
+        batch, consumed = [], 0
+        for row_no, row in enumerate(iter_catalog_rows(path, fmt)):
+            if row_no < skip_rows:
+                continue
+            consumed += 1
+            product = row_to_product(row)
+            if product:
+                batch.append(product)
+            if len(batch) >= self.batch_size:
+                yield consumed, batch
+                batch, consumed = [], 0
+        if batch or consumed:
+            yield consumed, batch
+
+    def _embed_batch(self, products: List[Dict]) -> tuple:
+        """
+        Prepares a batch and embeds only the SKUs whose text is new or changed.
+        """
+        ids, documents, metadatas = self.db.prepare_records(products)
+        changed, unchanged, added, removed = self.db.diff_records(ids, metadatas)
+        embeddings = self.db.embed([documents[i] for i in changed]) if changed else None
+        return ids, documents, metadatas, changed, unchanged, added, removed, embeddings
+
+    def run(self, path: str, fmt: Optional[str] = None, prune: bool = False) -> Dict:
+        """
+        With `prune`, the file is treated as the full catalog and SKUs missing from
+        it are deleted afterwards. Pruning needs a run over the whole file, so it is
+        skipped when resuming from a checkpoint.
+        """
+        rows_done = self._load_checkpoint(path)
+        if rows_done:
+            print(f"Resuming from checkpoint: {rows_done} rows already ingested.")
+            if prune:
+                print("WARNING: Not pruning deleted SKUs on a resumed run; re-run with --restart to prune.")
+                prune = False
+
+        stats = {"rows_skipped_on_resume": rows_done, "rows_read": 0, "products_upserted": 0, "batches": 0,
+                 "added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        seen = set()
+        t0 = time.perf_counter()
+        pending = deque()
+
+        def drain_one():
+            nonlocal rows_done
+            consumed, future = pending.popleft()
+            ids, documents, metadatas, changed, unchanged, added, removed, embeddings = future.result()
+            self.db.write_records(ids, documents, metadatas, changed, unchanged, embeddings, removed)
+            if prune:
+                seen.update(ids)
+            stats["added"] += added
+            stats["updated"] += len(changed) - added
+            stats["unchanged"] += len(unchanged)
+            rows_done += consumed
+            stats["rows_read"] += consumed
+            stats["products_upserted"] += len(ids)
+            stats["batches"] += 1
+            self._save_checkpoint(path, rows_done)
+            elapsed = time.perf_counter() - t0
+            print(f"Ingested {stats['products_upserted']} products "
+                  f"({stats['products_upserted'] / elapsed:.0f}/s, {rows_done} rows done)")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for consumed, products in self._batches(path, fmt, rows_done):
+                pending.append((consumed, pool.submit(self._embed_batch, products)))
+                # Bound memory: at most two batches per worker embedded ahead of the upserts
+                while len(pending) >= self.workers * 2:
+                    drain_one()
+            while pending:
+                drain_one()
+
+        # The file is fully ingested; a later run over it starts from the top again
+        self._clear_checkpoint()
+
+        if prune:
+            stats["deleted"] = self.db.delete_products([sku for sku in self.db.all_ids() if sku not in seen])
+
+        stats["seconds"] = round(time.perf_counter() - t0, 2)
+        stats["products_per_second"] = round(stats["products_upserted"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+        return stats
@@ -0,0 +1,65 @@
+from typing import List, Optional
+from app.services.pdf_processor import PDFDocument
+
+
+def _split_oversized(unit: str, max_chars: int) -> List[str]:
+    """
+    Splits a single page/block that is larger than a chunk on line boundaries.
+    """
+    if len(unit) <= max_chars:
+        return [unit]
+    pieces, current, size = [], [], 0
+    for line in unit.splitlines(keepends=True):
+        if size + len(line) > max_chars and current:
+            pieces.append("".join(current))
+            current, size = [], 0
+        # A single line longer than a chunk is hard-split
+        while len(line) > max_chars:
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        current.append(line)
+        size += len(line)
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+
+def chunk_units(units: List[str], max_chars: int, overlap_chars: int = 0) -> List[str]:
+    """
+    Packs consecutive text units (pages, rows) into chunks of at most ~max_chars,
+    never splitting a unit unless it is itself too large. Each chunk after the
+    first starts with the last `overlap_chars` of the previous one, so an item
+    straddling a boundary is seen whole by at least one chunk.
+    """
+    pieces = [piece for unit in units if unit.strip() for piece in _split_oversized(unit, max_chars)]
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        if size + len(piece) > max_chars and current:
+            chunks.append("".join(current))
+            tail = chunks[-1][-overlap_chars:] if overlap_chars else ""
+            current, size = ([tail], len(tail)) if tail else ([], 0)
+        current.append(piece)
+        size += len(piece)
+    if current and "".join(current).strip():
+        chunks.append("".join(current))
+    return chunks
+
+
+def chunk_pages(document: PDFDocument, pages: Optional[List[int]], max_chars: int,
+                overlap_chars: int = 0) -> List[str]:
+    """
+    Chunks the given pages (0-based, default all) on page boundaries.
+    Non-contiguous runs of pages, i.e. separate sections, never share a chunk.
+    """
+    pages = list(range(document.page_count)) if not pages else sorted(pages)
+    runs: List[List[int]] = []
+    for page_no in pages:
+        if runs and runs[-1][-1] == page_no - 1:
+            runs[-1].append(page_no)
+        else:
+            runs.append([page_no])
+
+    chunks = []
+    for run in runs:
+        chunks.extend(chunk_units([document.page_text(p) for p in run], max_chars, overlap_chars))
+    return chunks
@@ -0,0 +1,282 @@
+import time
+from typing import List, Dict, Optional
+import numpy as np
+from app.services.numpy_index import MetadataFilter, python_bytes
+
+CODE_DTYPES = ("int8", "float16")
+
+
+def _kmeans(sample: np.ndarray, n_lists: int, iters: int, seed: int = 0) -> np.ndarray:
+    """
+    Plain Lloyd's k-means on a training sample; empty clusters are re-seeded from random points.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iters):
+        assign = _nearest(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=n_lists)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+    return centroids
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray, block: int = 65536) -> np.ndarray:
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), block):
+        v = vectors[start:start + block]
+        # ||v||^2 is constant per row, so argmin of ||c||^2 - 2 v.c is the nearest centroid
+        out[start:start + block] = np.argmin(c_sq[None, :] - 2.0 * (v @ centroids.T), axis=1)
+    return out
+
+
+class IVFQuantizedIndex(MetadataFilter):
+    """
+    Approximate search for catalogs too large for a float32 matrix in RAM.
+    Vectors are clustered into `n_lists` inverted lists (IVF) and stored as
+    int8 codes with one float32 scale per vector (4x smaller than float32),
+    or as float16 (2x smaller). A query scans only the `nprobe` lists whose
+    centroids are nearest, so nprobe trades recall for latency.
+    Metadata is not held in memory: results are fetched from the collection by
+    id, and filter columns are loaded from it one field at a time on demand.
+    """
+    def __init__(self, ids: List[str], codes: np.ndarray, scales: Optional[np.ndarray], sq_norms: np.ndarray,
+                 centroids: np.ndarray, assign: np.ndarray, space: str = "l2", nprobe: int = 8,
+                 collection=None):
+        self.ids = ids
+        self.space = space
+        self.nprobe = nprobe
+        self.collection = collection
+        self.centroids = centroids
+        # Rows are stored grouped by list: list l occupies offsets[l]:offsets[l + 1]
+        order = np.argsort(assign, kind="stable")
+        self.list_rows = order.astype(np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))])
+        self.codes = np.ascontiguousarray(codes[order])
+        self.scales = scales[order] if scales is not None else None
+        self.sq_norms = sq_norms[order]
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vector_memory_bytes(self) -> int:
+        arrays = [self.codes, self.sq_norms, self.list_rows, self.offsets, self.centroids]
+        if self.scales is not None:
+            arrays.append(self.scales)
+        return int(sum(a.nbytes for a in arrays))
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Codes and lists plus the id list and any filter columns loaded so far.
+        At millions of rows the Python id strings outweigh int8 codes.
+        """
+        return self.vector_memory_bytes + python_bytes(self.ids) + self._columns_bytes()
+
+    @staticmethod
+    def _encode(block: np.ndarray, code_dtype: str) -> tuple:
+        if code_dtype == "float16":
+            return block.astype(np.float16), None
+        scales = np.maximum(np.abs(block).max(axis=1), 1e-12) / 127.0
+        codes = np.clip(np.rint(block / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def _decode(self, positions: np.ndarray) -> np.ndarray:
+        block = self.codes[positions].astype(np.float32)
+        if self.scales is not None:
+            block *= self.scales[positions, None]
+        return block
+
+    @classmethod
+    def from_collection(cls, collection, n_lists: int = 0, nprobe: int = 8, code_dtype: str = "int8",
+                        page_size: int = 10000, train_size: int = 50000, kmeans_iters: int = 10) -> "IVFQuantizedIndex":
+        """
+        Builds the index in one pass over the collection. Each page is quantized
+        as it arrives, so the float32 embeddings are never all in memory at once;
+        k-means is trained on a reservoir sample of at most `train_size` vectors.
+        `n_lists=0` picks about 4 * sqrt(N) lists.
+        """
+        if code_dtype not in CODE_DTYPES:
+            raise ValueError(f"code_dtype must be one of {CODE_DTYPES}, got {code_dtype!r}")
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        rng = np.random.default_rng(0)
+        ids, code_blocks, scale_blocks, norm_blocks = [], [], [], []
+        sample, seen = None, 0
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings"], limit=page_size, offset=offset)
+            if not len(page["ids"]):
+                break
+            block = np.asarray(page["embeddings"], dtype=np.float32)
+            if space == "cosine":
+                block /= np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+            ids.extend(page["ids"])
+            norm_blocks.append(np.einsum("ij,ij->i", block, block))
+            codes, scales = cls._encode(block, code_dtype)
+            code_blocks.append(codes)
+            if scales is not None:
+                scale_blocks.append(scales)
+
+            # Reservoir sample for k-means training
+            if sample is None:
+                sample = np.empty((train_size, block.shape[1]), dtype=np.float32)
+            fill = max(0, min(train_size - seen, len(block)))
+            sample[seen:seen + fill] = block[:fill]
+            if fill < len(block):
+                positions = np.arange(seen + fill, seen + len(block))
+                slots = rng.integers(0, positions + 1)
+                keep = slots < train_size
+                sample[slots[keep]] = block[fill:][keep]
+            seen += len(block)
+            offset += len(page["ids"])
+
+        if not ids:
+            empty = np.zeros((0, 0), dtype=np.float32)
+            return cls([], empty.astype(np.int8), None, np.zeros(0, np.float32), empty,
+                       np.zeros(0, np.int32), space, nprobe, collection)
+
+        codes = np.vstack(code_blocks)
+        scales = np.concatenate(scale_blocks) if scale_blocks else None
+        sample = sample[:min(seen, train_size)]
+        n_lists = n_lists or max(1, int(4 * np.sqrt(len(ids))))
+        n_lists = min(n_lists, len(sample))
+        centroids = _kmeans(sample, n_lists, kmeans_iters)
+
+        # Assign every vector from its decoded codes, block by block
+        assign = np.empty(len(ids), dtype=np.int32)
+        for start in range(0, len(ids), 65536):
+            block = codes[start:start + 65536].astype(np.float32)
+            if scales is not None:
+                block *= scales[start:start + 65536, None]
+            assign[start:start + 65536] = _nearest(block, centroids)
+        return cls(ids, codes, scales, np.concatenate(norm_blocks), centroids, assign, space, nprobe, collection)
+
+    def _field_values(self, field: str) -> List:
+        values = []
+        offset = 0
+        while offset < len(self.ids):
+            page = self.collection.get(include=["metadatas"], limit=10000, offset=offset)
+            if page["ids"] != self.ids[offset:offset + len(page["ids"])] or not page["ids"]:
+                raise RuntimeError("Catalog changed since the IVF index was built; reload it")
+            values.extend((meta or {}).get(field) for meta in page["metadatas"])
+            offset += len(page["ids"])
+        return values
+
+    def _probe_order(self, q: np.ndarray) -> np.ndarray:
+        c_sq = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        return np.argsort(c_sq - 2.0 * (self.centroids @ q))
+
+    def search_ids(self, query_embeddings, k: int = 3, rows: Optional[np.ndarray] = None,
+                   nprobe: Optional[int] = None) -> List[List[tuple]]:
+        """
+        Top-k (id, distance) per query. `rows` restricts the search to a subset of
+        the catalog; more lists are probed until at least k allowed rows are seen.
+        """
+        q_all = np.asarray(query_embeddings, dtype=np.float32)
+        nprobe = nprobe or self.nprobe
+        if not len(self.ids) or not len(q_all):
+            return [[] for _ in range(len(q_all))]
+        allowed = None
+        if rows is not None:
+            allowed = np.zeros(len(self.ids), dtype=bool)
+            allowed[rows] = True
+            allowed = allowed[self.list_rows]
+
+        results = []
+        for q in q_all:
+            if self.space == "cosine":
+                q = q / max(float(np.linalg.norm(q)), 1e-12)
+            order = self._probe_order(q)
+            probed, positions = 0, []
+            found = 0
+            while probed < len(order) and (probed < nprobe or found < k):
+                l = order[probed]
+                span = np.arange(self.offsets[l], self.offsets[l + 1])
+                if allowed is not None:
+                    span = span[allowed[span]]
+                positions.append(span)
+                found += len(span)
+                probed += 1
+            positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+            if not len(positions):
+                results.append([])
+                continue
+
+            dots = self._decode(positions) @ q
+            if self.space in ("cosine", "ip"):
+                dist = 1.0 - dots
+            else:
+                dist = np.maximum(float(q @ q) + self.sq_norms[positions] - 2.0 * dots, 0.0)
+            kk = min(k, len(positions))
+            top = np.argpartition(dist, kk - 1)[:kk] if kk < len(positions) else np.arange(len(positions))
+            top = top[np.argsort(dist[top])]
+            results.append([(self.ids[self.list_rows[positions[t]]], float(dist[t])) for t in top])
+        return results
+
+    def search_many(self, query_embeddings, k: int = 3, rows: Optional[np.ndarray] = None,
+                    nprobe: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Top-k metadata dicts (with 'distance') per query; metadata for all hits
+        is fetched from the collection in a single get.
+        """
+        hits = self.search_ids(query_embeddings, k=k, rows=rows, nprobe=nprobe)
+        wanted = sorted({sku for matches in hits for sku, _ in matches})
+        meta_of = {}
+        if wanted:
+            found = self.collection.get(ids=wanted, include=["metadatas"])
+            meta_of = dict(zip(found["ids"], found["metadatas"]))
+        results = []
+        for matches in hits:
+            items = []
+            for sku, dist in matches:
+                item = dict(meta_of.get(sku) or {})
+                item["distance"] = dist
+                items.append(item)
+            results.append(items)
+        return results
+
+
+def recall_latency_report(index: IVFQuantizedIndex, exact, query_embeddings, k: int = 10,
+                          nprobes: Optional[List[int]] = None) -> Dict:
+    """
+    Recall@k and per-query latency of the IVF index at several nprobe values,
+    measured against exact search (a NumpyVectorIndex over the same collection).
+    """
+    q = np.asarray(query_embeddings, dtype=np.float32)
+    nprobes = nprobes or [1, 2, 4, 8, 16, 32]
+    # Ground truth by id, so the comparison doesn't depend on metadata contents
+    t0 = time.perf_counter()
+    dist = exact.distances(q)
+    kk = min(k, len(exact.ids))
+    truth = [{exact.ids[i] for i in np.argsort(row)[:kk]} for row in dist]
+    exact_ms = (time.perf_counter() - t0) * 1000 / max(len(q), 1)
+
+    report = {"k": k, "queries": len(q), "catalog_size": len(index), "exact_ms_per_query": round(exact_ms, 3),
+              "exact_memory_bytes": exact.memory_bytes, "ivf_memory_bytes": index.memory_bytes,
+              "exact_vector_memory_bytes": exact.vector_memory_bytes,
+              "ivf_vector_memory_bytes": index.vector_memory_bytes,
+              "n_lists": len(index.centroids), "points": []}
+    for nprobe in nprobes:
+        if nprobe > len(index.centroids):
+            break
+        latencies = []
+        recall = 0.0
+        for qi in range(len(q)):
+            t = time.perf_counter()
+            hits = index.search_ids(q[qi:qi + 1], k=k, nprobe=nprobe)[0]
+            latencies.append((time.perf_counter() - t) * 1000)
+            if truth[qi]:
+                recall += len({sku for sku, _ in hits} & truth[qi]) / len(truth[qi])
+        report["points"].append({
+            "nprobe": nprobe,
+            "recall_at_k": round(recall / max(len(q), 1), 4),
+            "mean_ms": round(float(np.mean(latencies)), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        })
+    return report
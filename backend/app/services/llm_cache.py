@@ -0,0 +1,95 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from app.core.config import settings
+
+
+class LLMResponseCache:
+    """
+    Disk-backed cache of raw LLM responses, keyed by a hash of model name,
+    prompt template and chunk text. Backed by SQLite with size-bounded LRU
+    eviction, so unchanged chunks of a re-run or corrigendum skip the Groq call.
+    """
+    def __init__(self, path: str = None, max_bytes: int = None):
+        self.path = path or settings.LLM_CACHE_PATH
+        self.max_bytes = max_bytes or settings.LLM_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+
+    @staticmethod
+    def make_key(model_name: str, template: str, text: str) -> str:
+        sha = hashlib.sha256()
+        for part in (model_name, template, text):
+            sha.update(part.encode("utf-8"))
+            sha.update(b"\x00")
+        return sha.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._evict()
+
+    def _evict(self):
+        """
+        Drops least recently used entries until the cache fits in max_bytes.
+        Caller holds the lock and an open transaction.
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall():
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,207 @@
+import sys
+from abc import ABC, abstractmethod
+from typing import List, Dict, Optional
+import numpy as np
+
+
+def python_bytes(values: List) -> int:
+    """
+    Approximate heap size of a list of ids or metadata dicts: the list itself,
+    each element and, for dicts, their keys and values.
+    """
+    total = sys.getsizeof(values)
+    for value in values:
+        total += sys.getsizeof(value)
+        if isinstance(value, dict):
+            total += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return total
+
+
+class MetadataFilter(ABC):
+    """
+    Chroma-style `where` filtering for in-process indexes. Each metadata field
+    used in a filter becomes one array, built on first use; subclasses supply
+    the per-row values through _field_values().
+    """
+    _columns: Dict[str, np.ndarray]
+
+    @abstractmethod
+    def _field_values(self, field: str) -> List:
+        """
+        The value of `field` for every row, in row order; None where it is missing.
+        """
+
+    def _columns_bytes(self) -> int:
+        total = 0
+        for column in self._columns.values():
+            total += column.nbytes
+            if column.dtype == object:
+                total += sum(sys.getsizeof(v) for v in column if v is not None)
+        return total
+
+    def _column(self, field: str) -> np.ndarray:
+        """
+        One metadata field as an array: float64 with NaN for missing values when
+        every present value is numeric, otherwise an object array with None.
+        """
+        if field not in self._columns:
+            values = self._field_values(field)
+            present = [v for v in values if v is not None]
+            if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+                column = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+            self._columns[field] = column
+        return self._columns[field]
+
+    def _mask(self, where: Dict) -> np.ndarray:
+        """
+        Boolean row mask for a Chroma-style `where` clause ($and, $or, $eq, $ne,
+        $gt, $gte, $lt, $lte, $in, $nin). Rows missing the field never match.
+        """
+        n = len(self.ids)
+        mask = np.ones(n, dtype=bool)
+        for key, cond in where.items():
+            if key == "$and":
+                for sub in cond:
+                    mask &= self._mask(sub)
+                continue
+            if key == "$or":
+                any_mask = np.zeros(n, dtype=bool)
+                for sub in cond:
+                    any_mask |= self._mask(sub)
+                mask &= any_mask
+                continue
+
+            column = self._column(key)
+            numeric = column.dtype == np.float64
+            present = ~np.isnan(column) if numeric else np.array([v is not None for v in column], dtype=bool)
+            ops = cond if isinstance(cond, dict) else {"$eq": cond}
+            for op, value in ops.items():
+                if op in ("$in", "$nin"):
+                    hit = np.isin(column, list(value)) if numeric else np.array([v in value for v in column], dtype=bool)
+                    if op == "$nin":
+                        hit = ~hit
+                elif op in ("$eq", "$ne"):
+                    hit = column == value
+                    if op == "$ne":
+                        hit = ~hit
+                else:
+                    if not numeric or isinstance(value, str):
+                        raise ValueError(f"Operator {op} needs a numeric field and value: {key}")
+                    with np.errstate(invalid="ignore"):
+                        hit = {"$gt": column > value, "$gte": column >= value,
+                               "$lt": column < value, "$lte": column <= value}[op]
+                mask &= present & np.asarray(hit, dtype=bool)
+        return mask
+
+    def rows_matching(self, where: Dict) -> np.ndarray:
+        """
+        Row numbers matching a metadata filter, for search_many(rows=...).
+        """
+        return np.flatnonzero(self._mask(where))
+
+
+class NumpyVectorIndex(MetadataFilter):
+    """
+    Exact in-process search over the whole catalog. All product embeddings sit
+    in one contiguous float32 matrix; a batch of queries is answered with a
+    single matrix multiply and an argpartition top-k. Chroma stays the durable
+    store; this index is loaded from it and rebuilt when the catalog changes.
+    Distances follow the collection's space so scores match Chroma's.
+    """
+    def __init__(self, ids: List[str], embeddings: np.ndarray, metadatas: List[Dict], space: str = "l2"):
+        self.ids = ids
+        self.metadatas = metadatas
+        self.space = space
+        self.matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if space == "cosine" and len(self.matrix):
+            norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+            self.matrix /= np.maximum(norms, 1e-12)
+        # Squared norms are reused by every l2 query
+        self.sq_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+        # Metadata columns for pre-filtering, built on first use per field
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vector_memory_bytes(self) -> int:
+        return int(self.matrix.nbytes + self.sq_norms.nbytes)
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Vectors plus the ids, metadata and filter columns held alongside them.
+        """
+        return self.vector_memory_bytes + python_bytes(self.ids) + python_bytes(self.metadatas) + self._columns_bytes()
+
+    @classmethod
+    def from_collection(cls, collection, page_size: int = 10000) -> "NumpyVectorIndex":
+        """
+        Loads every embedding and metadata row from a Chroma collection, page by page.
+        """
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        ids, metadatas, blocks = [], [], []
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "metadatas"], limit=page_size, offset=offset)
+            if not len(page["ids"]):
+                break
+            ids.extend(page["ids"])
+            metadatas.extend(page["metadatas"])
+            blocks.append(np.asarray(page["embeddings"], dtype=np.float32))
+            offset += len(page["ids"])
+        embeddings = np.vstack(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+        return cls(ids, embeddings, metadatas, space)
+
+    def _field_values(self, field: str) -> List:
+        return [meta.get(field) if meta else None for meta in self.metadatas]
+
+    def distances(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        (n_queries, n_rows) distance matrix in the collection's space.
+        """
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        sq_norms = self.sq_norms if rows is None else self.sq_norms[rows]
+        q = np.asarray(queries, dtype=np.float32)
+        if self.space == "cosine":
+            q = q / np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+            return 1.0 - q @ matrix.T
+        if self.space == "ip":
+            return 1.0 - q @ matrix.T
+        q_sq = np.einsum("ij,ij->i", q, q)[:, None]
+        # ||q - m||^2 = ||q||^2 + ||m||^2 - 2 q.m ; clamp float error below zero
+        return np.maximum(q_sq + sq_norms[None, :] - 2.0 * (q @ matrix.T), 0.0)
+
+    def search_many(self, query_embeddings, k: int = 3, rows: Optional[np.ndarray] = None) -> List[List[Dict]]:
+        """
+        Top-k metadata dicts (with 'distance') per query. `rows` restricts the
+        search to a subset of the catalog, e.g. a metadata pre-filter.
+        """
+        q = np.asarray(query_embeddings, dtype=np.float32)
+        n = len(self.ids) if rows is None else len(rows)
+        if n == 0 or len(q) == 0:
+            return [[] for _ in range(len(q))]
+
+        dist = self.distances(q, rows)
+        k = min(k, n)
+        # argpartition finds the k best in O(n); only those k are then sorted
+        top = np.argpartition(dist, k - 1, axis=1)[:, :k] if k < n else np.tile(np.arange(n), (len(q), 1))
+        top_dist = np.take_along_axis(dist, top, axis=1)
+        order = np.argsort(top_dist, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_dist = np.take_along_axis(top_dist, order, axis=1)
+
+        results = []
+        for qi in range(len(q)):
+            matches = []
+            for col, d in zip(top[qi], top_dist[qi]):
+                row = int(col) if rows is None else int(rows[col])
+                item = dict(self.metadatas[row])
+                item["distance"] = float(d)
+                matches.append(item)
+            results.append(matches)
+        return results
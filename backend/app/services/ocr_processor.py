@@ -0,0 +1,111 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+from app.core.config import settings
+from app.services.pdf_processor import PDFDocument
+
+
+def _ocr_page(source: Union[str, bytes], page_no: int, dpi: int, lang: str) -> Tuple[int, str, float]:
+    """
+    Process pool worker: rasterizes a single page (0-based) and runs Tesseract on it.
+    """
+    from pdf2image import convert_from_bytes, convert_from_path
+    import pytesseract
+
+    t0 = time.perf_counter()
+    kwargs = {"dpi": dpi, "first_page": page_no + 1, "last_page": page_no + 1}
+    if isinstance(source, (bytes, bytearray)):
+        images = convert_from_bytes(source, **kwargs)
+    else:
+        images = convert_from_path(source, **kwargs)
+
+    text = "\n".join(pytesseract.image_to_string(image, lang=lang) for image in images)
+    return page_no, text, time.perf_counter() - t0
+
+
+class OCRProcessor:
+    """
+    OCR stage for scanned tenders. Only pages without a usable text layer are
+    rasterized and OCR'd, in a bounded process pool. Results are cached on disk
+    by page hash, DPI and language, and merged back into the PDFDocument's page-ordered text.
+    """
+    def __init__(self, cache_dir: str = None, max_workers: int = None, dpi: int = None, lang: str = None):
+        self.cache_dir = cache_dir or settings.OCR_CACHE_DIR
+        self.max_workers = max_workers or settings.OCR_MAX_WORKERS
+        self.dpi = dpi or settings.OCR_DPI
+        self.lang = lang or settings.OCR_LANG
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        True when pytesseract, pdf2image and the tesseract binary are all usable.
+        """
+        try:
+            import pdf2image  # noqa: F401
+            import pytesseract
+            pytesseract.get_tesseract_version()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def pages_without_text(document: PDFDocument, min_chars: int = None) -> List[int]:
+        min_chars = settings.OCR_MIN_PAGE_CHARS if min_chars is None else min_chars
+        return [
+            page_no for page_no, text in document.iter_pages()
+            if len(text.strip()) < min_chars
+        ]
+
+    def _cache_path(self, page_hash: str) -> str:
+        # DPI and language both change the recognized text, so both are part of the key
+        return os.path.join(self.cache_dir, f"{page_hash}.{self.dpi}dpi.{self.lang}.txt")
+
+    def ocr_document(self, document: PDFDocument, pages: List[int] = None) -> Dict:
+        """
+        OCRs the given pages (default: every page without a text layer) and
+        writes the text back into `document`. Returns per-run counters.
+        """
+        pages = self.pages_without_text(document) if pages is None else pages
+        stats = {"pages": len(pages), "cache_hits": 0, "ocr_runs": 0, "failed": 0, "seconds": 0.0}
+        if not pages:
+            return stats
+
+        t0 = time.perf_counter()
+        pending: Dict[int, str] = {}
+        for page_no in pages:
+            page_hash = document.page_hash(page_no)
+            cache_path = self._cache_path(page_hash)
+            if os.path.exists(cache_path):
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    document.set_page_text(page_no, f.read(), ocr=True)
+                stats["cache_hits"] += 1
+            else:
+                pending[page_no] = cache_path
+
+        if pending:
+            workers = max(1, min(self.max_workers, len(pending)))
+            print(f"DEBUG: OCR running on {len(pending)} pages with {workers} workers...")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_ocr_page, document.source, page_no, self.dpi, self.lang)
+                    for page_no in pending
+                ]
+                for future in futures:
+                    try:
+                        page_no, text, elapsed = future.result()
+                    except Exception as e:
+                        print(f"WARNING: OCR failed for a page: {e}")
+                        stats["failed"] += 1
+                        continue
+                    document.set_page_text(page_no, text, ocr=True)
+                    document.page_timings[page_no] = document.page_timings.get(page_no, 0.0) + elapsed
+                    tmp_path = f"{pending[page_no]}.{os.getpid()}.tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        f.write(text)
+                    os.replace(tmp_path, pending[page_no])
+                    stats["ocr_runs"] += 1
+
+        stats["seconds"] = round(time.perf_counter() - t0, 3)
+        return stats
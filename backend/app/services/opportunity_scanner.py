@@ -0,0 +1,139 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from app.core.config import settings
+from app.services.agent_registry import agents
+
+
+class OpportunityScanner:
+    """
+    Scans the tender portals on a fixed interval in the background and keeps
+    the latest opportunity snapshot in memory. Reads are served from the
+    snapshot; a read that finds it older than the TTL still gets it (flagged
+    stale) and triggers one refresh in the background. Only one scan runs at a
+    time; concurrent refresh requests wait for the scan already in flight.
+    """
+    def __init__(self, interval: float = None, ttl: float = None, sales_agent=None):
+        # Defaults to the registry's shared SalesAgent, resolved at scan time
+        self.sales_agent = sales_agent
+        self.interval = interval or settings.OPPORTUNITY_SCAN_INTERVAL_SECONDS
+        self.ttl = ttl or settings.OPPORTUNITY_CACHE_TTL_SECONDS
+        self.snapshot: Optional[Dict] = None
+        self.scanned_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.scan_count = 0
+        self.next_scan_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _scan_frequency(self) -> str:
+        hours = self.interval / 3600
+        return f"Every {hours:g} Hours" if hours >= 1 else f"Every {self.interval / 60:g} Minutes"
+
+    async def _scan(self) -> Dict:
+        try:
+            snapshot = await (self.sales_agent or agents.get_sales_agent()).ascan_for_rfps()
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"WARNING: Opportunity scan failed: {e}")
+            raise
+        snapshot["scan_frequency"] = self._scan_frequency()
+        self.snapshot = snapshot
+        self.scanned_at = time.time()
+        self.last_error = None
+        self.scan_count += 1
+        print(f"DEBUG: Opportunity scan #{self.scan_count} found {snapshot.get('opportunities_found', 0)} opportunities.")
+        return snapshot
+
+    async def refresh(self) -> Dict:
+        """
+        Runs a scan now, or joins the one already in progress.
+        """
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._scan())
+        # shield: a cancelled caller must not cancel the shared scan
+        return await asyncio.shield(self._inflight)
+
+    def age_seconds(self) -> Optional[float]:
+        return None if self.scanned_at is None else time.time() - self.scanned_at
+
+    def is_stale(self) -> bool:
+        age = self.age_seconds()
+        return age is None or age > self.ttl
+
+    def _empty_snapshot(self) -> Dict:
+        return {
+            "last_scanned": None,
+            "scan_frequency": self._scan_frequency(),
+            "opportunities_found": 0,
+            "opportunities": [],
+            "last_error": self.last_error
+        }
+
+    async def latest(self) -> Dict:
+        """
+        The cached snapshot. Scans first only when there is none yet; a stale
+        snapshot is returned as-is while a background refresh brings it up to date.
+        If there is no snapshot and the scan fails, an empty one carrying
+        `last_error` is returned instead of raising; the next read scans again.
+        """
+        if self.snapshot is None:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                return self._empty_snapshot()
+        elif self.is_stale() and (self._inflight is None or self._inflight.done()):
+            self._inflight = asyncio.ensure_future(self._scan())
+            # Errors surface through last_error on the next read
+            self._inflight.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self.snapshot
+
+    def cache_info(self) -> Dict:
+        age = self.age_seconds()
+        next_scan = self.next_scan_at if self.running else None
+        return {
+            "scanned_at": datetime.fromtimestamp(self.scanned_at).strftime("%Y-%m-%d %H:%M:%S") if self.scanned_at else None,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "ttl_seconds": self.ttl,
+            "stale": self.is_stale(),
+            "next_scan_at": datetime.fromtimestamp(next_scan).strftime("%Y-%m-%d %H:%M:%S") if next_scan else None,
+            "scan_in_progress": self._inflight is not None and not self._inflight.done(),
+            "scan_count": self.scan_count,
+            "last_error": self.last_error
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # Logged in _scan; keep serving the previous snapshot
+            self.next_scan_at = time.time() + self.interval
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._inflight):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._task = None
+        self._inflight = None
+
+
+opportunity_scanner = OpportunityScanner()
@@ -1,31 +1,321 @@
 import fitz  # PyMuPDF
-from typing import List, Dict
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterator, Optional, Tuple, Union
+
+
+def _open_fitz(source: Union[str, bytes]) -> fitz.Document:
+    """
+    Opens a PDF from a file path or raw bytes. Paths are read by MuPDF
+    straight from disk, so no extra in-memory copy of the file is made.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source, filetype="pdf")
+
+
+def _page_layout(page: fitz.Page) -> Dict:
+    """
+    Heading candidates on a page, for section detection.
+    Body size is the font size carrying the most characters; a line is a
+    candidate when it is short and larger than body text, bold or all caps.
+    """
+    chars_by_size: Dict[float, int] = {}
+    lines = []
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", []):
+            spans = [span for span in line["spans"] if span["text"].strip()]
+            if not spans:
+                continue
+            text = " ".join(span["text"].strip() for span in spans)
+            size = round(max(span["size"] for span in spans), 1)
+            bold = all(span["flags"] & 16 for span in spans)
+            for span in spans:
+                key = round(span["size"], 1)
+                chars_by_size[key] = chars_by_size.get(key, 0) + len(span["text"])
+            lines.append((text, size, bold))
+
+    body_size = max(chars_by_size, key=chars_by_size.get) if chars_by_size else 0.0
+    headings = [
+        {"text": text, "size": size, "bold": bold}
+        for text, size, bold in lines
+        if 3 <= len(text) <= 150 and (size > body_size * 1.1 or bold or (text.isupper() and len(text) <= 80))
+    ]
+    return {"body_size": body_size, "headings": headings}
+
+
+def _extract_page_range(source: Union[str, bytes], start: int, end: int,
+                        with_layout: bool = False) -> List[Tuple[int, str, float, Optional[Dict]]]:
+    """
+    Process pool worker. fitz.Document handles can't be pickled,
+    so every worker opens its own copy and extracts pages [start, end).
+    Returns (page_number, text, seconds, layout) tuples.
+    """
+    doc = _open_fitz(source)
+    try:
+        pages = []
+        for page_no in range(start, end):
+            t0 = time.perf_counter()
+            page = doc[page_no]
+            text = page.get_text()
+            layout = _page_layout(page) if with_layout else None
+            pages.append((page_no, text, time.perf_counter() - t0, layout))
+        return pages
+    finally:
+        doc.close()
+
+
+class PDFDocument:
+    """
+    A single open handle on an RFP PDF, shared by every pipeline stage.
+    Page count and metadata come straight from the document; page text is
+    only extracted when a stage asks for it and is cached per page.
+    """
+    def __init__(self, source: Union[str, bytes]):
+        self._source = source
+        self._doc = _open_fitz(source)
+        self._page_text: Dict[int, str] = {}
+        self._page_layout: Dict[int, Dict] = {}
+        self.page_timings: Dict[int, float] = {}
+        self.ocr_pages: List[int] = []
+        self.extraction_mode = "lazy"
+
+    def __enter__(self) -> "PDFDocument":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.page_count
+
+    @property
+    def page_count(self) -> int:
+        return len(self._doc)
+
+    @property
+    def metadata(self) -> Dict:
+        return self._doc.metadata
+
+    @property
+    def source(self) -> Union[str, bytes]:
+        """
+        What the document was opened from, so worker processes can open their own handle.
+        """
+        return self._source
+
+    @property
+    def closed(self) -> bool:
+        return self._doc.is_closed
+
+    def close(self):
+        if not self._doc.is_closed:
+            self._doc.close()
+
+    def page(self, page_no: int) -> fitz.Page:
+        """
+        Raw PyMuPDF page (0-based) for stages that need more than text, e.g. blocks or tables.
+        """
+        return self._doc[page_no]
+
+    def page_text(self, page_no: int) -> str:
+        """
+        Text of a single page (0-based), extracted on first access.
+        """
+        if page_no not in self._page_text:
+            t0 = time.perf_counter()
+            self._page_text[page_no] = self._doc[page_no].get_text()
+            self.page_timings[page_no] = time.perf_counter() - t0
+        return self._page_text[page_no]
+
+    def set_page_text(self, page_no: int, text: str, ocr: bool = False):
+        """
+        Replaces the cached text of a page, e.g. with OCR output for a scanned page.
+        """
+        self._page_text[page_no] = text
+        if ocr and page_no not in self.ocr_pages:
+            self.ocr_pages.append(page_no)
+
+    def page_hash(self, page_no: int) -> str:
+        """
+        SHA-256 over the page's content streams and the raw image streams it draws.
+        Identical scanned pages hash the same across documents and re-uploads.
+        """
+        page = self._doc[page_no]
+        sha = hashlib.sha256()
+        for xref in page.get_contents():
+            sha.update(self._doc.xref_stream(xref) or b"")
+        for image in page.get_images(full=True):
+            sha.update(self._doc.xref_stream_raw(image[0]) or b"")
+        return sha.hexdigest()
+
+    def page_layout(self, page_no: int) -> Dict:
+        """
+        Font-size based heading candidates for a page (0-based), computed on first access.
+        """
+        if page_no not in self._page_layout:
+            self._page_layout[page_no] = _page_layout(self._doc[page_no])
+        return self._page_layout[page_no]
+
+    def text_for_pages(self, page_numbers: List[int], max_chars: Optional[int] = None) -> str:
+        """
+        Text of the given pages (0-based) in the order given, stopping once `max_chars` is reached.
+        """
+        parts = []
+        size = 0
+        for page_no in page_numbers:
+            text = self.page_text(page_no)
+            parts.append(text)
+            size += len(text)
+            if max_chars is not None and size >= max_chars:
+                break
+        joined = "".join(parts)
+        return joined if max_chars is None else joined[:max_chars]
+
+    def iter_pages(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Yields (page_number, text) pairs one page at a time.
+        """
+        end = self.page_count if end is None else min(end, self.page_count)
+        for page_no in range(start, end):
+            yield page_no, self.page_text(page_no)
+
+    def text(self, max_chars: Optional[int] = None) -> str:
+        """
+        Document text in page order. With `max_chars`, only as many pages
+        as needed are extracted and the result is truncated to that length.
+        """
+        parts = []
+        size = 0
+        for _, text in self.iter_pages():
+            parts.append(text)
+            size += len(text)
+            if max_chars is not None and size >= max_chars:
+                break
+        full_text = "".join(parts)
+        return full_text if max_chars is None else full_text[:max_chars]
+
+    def has_text(self, min_chars: int = 50) -> bool:
+        """
+        True once at least `min_chars` non-whitespace characters have been seen.
+        Stops reading pages as soon as the threshold is reached.
+        """
+        seen = 0
+        for _, text in self.iter_pages():
+            seen += len(text.strip())
+            if seen >= min_chars:
+                return True
+        return False
+
+    def load_all(self, parallel: bool = False, parallel_min_pages: Optional[int] = None,
+                 max_workers: Optional[int] = None, with_layout: bool = False):
+        """
+        Eagerly fills the page cache. Uses a process pool when `parallel` is set,
+        or when the document has at least `parallel_min_pages` pages.
+        `with_layout` also collects heading candidates in the same pass.
+        """
+        missing = [
+            p for p in range(self.page_count)
+            if p not in self._page_text or (with_layout and p not in self._page_layout)
+        ]
+        if not missing:
+            return
+
+        use_pool = parallel or (parallel_min_pages is not None and self.page_count >= parallel_min_pages)
+        if use_pool and len(missing) > 1:
+            pages = PDFProcessor._extract_pages_parallel(self._source, self.page_count, max_workers, with_layout)
+            for page_no, text, elapsed, layout in pages:
+                self._page_text[page_no] = text
+                self.page_timings[page_no] = elapsed
+                if layout is not None:
+                    self._page_layout[page_no] = layout
+            self.extraction_mode = "parallel"
+        else:
+            for page_no in missing:
+                self.page_text(page_no)
+                if with_layout:
+                    self.page_layout(page_no)
+            self.extraction_mode = "serial"
+
+    def timings(self) -> List[Dict]:
+        return [
+            {"page": page_no + 1, "seconds": round(elapsed, 6)}
+            for page_no, elapsed in sorted(self.page_timings.items())
+        ]
+
 
 class PDFProcessor:
+    @staticmethod
+    def open(source: Union[str, bytes]) -> PDFDocument:
+        """
+        Opens the PDF once, from a spooled file path (preferred) or raw bytes.
+        Use as a context manager so the handle is closed deterministically.
+        """
+        return PDFDocument(source)
+
     @staticmethod
     def extract_text_from_bytes(file_content: bytes) -> str:
         """
         Extracts raw text from PDF bytes.
         """
-        doc = fitz.open(stream=file_content, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text
+        with PDFProcessor.open(file_content) as document:
+            return document.text()
 
     @staticmethod
-    def extract_structured_data(file_content: bytes) -> Dict:
+    def extract_structured_data(file_content: Union[str, bytes], parallel: bool = False,
+                                parallel_min_pages: Optional[int] = None,
+                                max_workers: Optional[int] = None) -> Dict:
         """
         Try to identify tables or specific sections.
         For MVP, we just return full text and metadata.
+
+        Pages are extracted in a process pool when `parallel` is set, or when the
+        document has at least `parallel_min_pages` pages.
+        """
+        with PDFProcessor.open(file_content) as document:
+            document.load_all(parallel=parallel, parallel_min_pages=parallel_min_pages, max_workers=max_workers)
+            return {
+                "full_text": document.text(),
+                "page_count": document.page_count,
+                "metadata": document.metadata,
+                "extraction_mode": document.extraction_mode,
+                "page_timings": document.timings()
+            }
+
+    @staticmethod
+    def _extract_pages_parallel(source: Union[str, bytes], page_count: int,
+                                max_workers: Optional[int] = None,
+                                with_layout: bool = False) -> List[Tuple[int, str, float, Optional[Dict]]]:
         """
-        doc = fitz.open(stream=file_content, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-            
-        return {
-            "full_text": text,
-            "page_count": len(doc),
-            "metadata": doc.metadata
-        }
+        Splits the page range into contiguous batches and extracts them in a process pool.
+        Batches come back out of order, so pages are re-sorted before joining.
+        Workers open `source` themselves from a path. Bytes are written to a temp
+        file first, so the PDF isn't pickled to the pool once per batch.
+        """
+        workers = max(1, min(max_workers or os.cpu_count() or 1, page_count))
+        # A few batches per worker keeps the pool busy when some pages are much heavier than others
+        batch_size = max(1, -(-page_count // (workers * 4)))
+        ranges = [(start, min(start + batch_size, page_count)) for start in range(0, page_count, batch_size)]
+
+        temp_path = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            fd, temp_path = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(fd, "wb") as f:
+                f.write(source)
+            source = temp_path
+
+        pages = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_extract_page_range, source, start, end, with_layout) for start, end in ranges]
+                for future in futures:
+                    pages.extend(future.result())
+        finally:
+            if temp_path:
+                os.remove(temp_path)
+
+        pages.sort(key=lambda p: p[0])
+        return pages
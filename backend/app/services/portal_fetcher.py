@@ -0,0 +1,135 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+import httpx
+from app.core.config import settings
+
+# Responses worth retrying; anything else is returned as-is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchResult:
+    def __init__(self, url: str, status: Optional[int] = None, text: str = "", error: Optional[str] = None,
+                 attempts: int = 0, elapsed: float = 0.0):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "status": self.status,
+            "ok": self.ok,
+            "error": self.error,
+            "attempts": self.attempts,
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "bytes": len(self.text)
+        }
+
+
+class PortalFetcher:
+    """
+    Concurrent fetching of tender portals over one shared, connection-pooled
+    httpx.AsyncClient. Each host gets its own semaphore so a single portal is
+    never hit with more than `max_per_host` requests at once. Every source has
+    its own per-request timeout and an overall deadline, and transport errors
+    or retryable statuses are retried with exponential backoff within it. The client belongs to the event loop it was
+    created on and is recreated if used from another loop.
+    """
+    def __init__(self, max_per_host: int = None, max_connections: int = None, timeout: float = None,
+                 retries: int = None, backoff: float = None, deadline: float = None):
+        self.max_per_host = max_per_host or settings.PORTAL_MAX_PER_HOST
+        self.max_connections = max_connections or settings.PORTAL_MAX_CONNECTIONS
+        self.timeout = timeout or settings.PORTAL_FETCH_TIMEOUT
+        self.deadline = deadline or settings.PORTAL_FETCH_DEADLINE
+        self.retries = settings.PORTAL_FETCH_RETRIES if retries is None else retries
+        self.backoff = settings.PORTAL_RETRY_BACKOFF if backoff is None else backoff
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Semaphores are bound to a loop as well, so they are rebuilt with the client
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                follow_redirects=True,
+                headers={"User-Agent": "Mozilla/5.0 (compatible; RFPScanner/1.0)"}
+            )
+            self._loop = loop
+            self._host_limits = {}
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_limits[host]
+
+    async def fetch(self, url: str, timeout: Optional[float] = None,
+                    deadline: Optional[float] = None) -> FetchResult:
+        """
+        GETs one URL. `timeout` bounds each request, `deadline` the whole fetch
+        including retries and backoff. Never raises: failures come back as a
+        FetchResult with `error` set.
+        """
+        deadline = deadline or self.deadline
+        t0 = time.perf_counter()
+        result = FetchResult(url)
+        try:
+            await asyncio.wait_for(self._fetch_with_retries(url, timeout or self.timeout, result), deadline)
+        except asyncio.TimeoutError:
+            result.error = f"Deadline of {deadline}s exceeded after {result.attempts} attempt(s)"
+        result.elapsed = time.perf_counter() - t0
+        return result
+
+    async def _fetch_with_retries(self, url: str, timeout: float, result: FetchResult):
+        """
+        The retry loop behind fetch(); fills `result` in place so a deadline
+        cutting it short still reports the attempts made.
+        """
+        client = self._get_client()
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            try:
+                async with self._host_limit(url):
+                    response = await client.get(url, timeout=timeout)
+                result.status = response.status_code
+                result.text = response.text
+                result.error = None
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                result.error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                result.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def fetch_all(self, sources: List[Dict]) -> AsyncIterator[FetchResult]:
+        """
+        Fetches every source ({"url": ..., optional "timeout" and "deadline" seconds}) concurrently
+        and yields each result as soon as it arrives, so callers can start parsing
+        while slower portals are still loading.
+        """
+        tasks = [asyncio.ensure_future(self.fetch(s["url"], s.get("timeout"), s.get("deadline"))) for s in sources]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import Date, Float, Index, Integer, String, create_engine, select, update, or_
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+from app.core.config import settings
+
+# SQLite caps bound parameters per statement; larger SKU lists are split
+MAX_SKUS_PER_QUERY = 900
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class PriceEntry(Base):
+    """
+    One price for a SKU, valid from `effective_from` until `effective_to`
+    (exclusive; open-ended when NULL).
+    """
+    __tablename__ = "price_book"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sku: Mapped[str] = mapped_column(String(64), nullable=False)
+    unit_price: Mapped[float] = mapped_column(Float, nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), default="INR")
+    effective_from: Mapped[date] = mapped_column(Date, nullable=False)
+    effective_to: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
+    __table_args__ = (Index("ix_price_book_sku_effective", "sku", "effective_from"),)
+
+
+class PriceBookMeta(Base):
+    __tablename__ = "price_book_meta"
+
+    key: Mapped[str] = mapped_column(String(32), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class PriceBook:
+    """
+    Effective-dated SKU prices in SQL, looked up in bulk. A BOM is priced with
+    one indexed query for all of its SKUs, and results are kept in a bounded
+    in-process LRU cache. Every write bumps the price-book version; readers
+    compare versions (a single-row read, at most every `version_check_seconds`)
+    and drop the cache on change, so prices updated by another process are
+    picked up within that interval. Writes through this instance apply at once.
+    """
+    def __init__(self, url: str = None, cache_size: int = None, version_check_seconds: float = None):
+        url = url or settings.SQLALCHEMY_DATABASE_URI
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = create_engine(url, connect_args=connect_args)
+        Base.metadata.create_all(self.engine)
+        self._lock = threading.Lock()
+        self.cache_size = cache_size or settings.PRICE_BOOK_CACHE_SIZE
+        self.version_check_seconds = (settings.PRICE_BOOK_VERSION_CHECK_SECONDS
+                                      if version_check_seconds is None else version_check_seconds)
+        self._cache: "OrderedDict[tuple, Optional[float]]" = OrderedDict()
+        self._cache_version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def version(self) -> int:
+        with Session(self.engine) as session:
+            row = session.get(PriceBookMeta, "version")
+            return row.value if row else 0
+
+    def _bump_version(self, session: Session):
+        row = session.get(PriceBookMeta, "version")
+        if row is None:
+            session.add(PriceBookMeta(key="version", value=1))
+        else:
+            row.value += 1
+
+    def set_prices(self, prices: Dict[str, float], effective_from: Optional[date] = None, currency: str = "INR") -> int:
+        """
+        Publishes new prices from `effective_from` (default today). The open-ended
+        entry each SKU had before that date is closed off at that date, and
+        entries scheduled from the same date are replaced.
+        """
+        effective_from = effective_from or date.today()
+        skus = [str(sku) for sku in prices]
+        with Session(self.engine) as session, session.begin():
+            for start in range(0, len(skus), MAX_SKUS_PER_QUERY):
+                batch = skus[start:start + MAX_SKUS_PER_QUERY]
+                session.query(PriceEntry).filter(
+                    PriceEntry.sku.in_(batch), PriceEntry.effective_from == effective_from
+                ).delete(synchronize_session=False)
+                session.execute(
+                    update(PriceEntry)
+                    .where(PriceEntry.sku.in_(batch), PriceEntry.effective_to.is_(None),
+                           PriceEntry.effective_from < effective_from)
+                    .values(effective_to=effective_from)
+                )
+            session.add_all([
+                PriceEntry(sku=sku, unit_price=float(prices[sku]), currency=currency, effective_from=effective_from)
+                for sku in skus
+            ])
+            self._bump_version(session)
+        with self._lock:
+            # Force a version check on the next read
+            self._version_checked_at = 0.0
+        return len(skus)
+
+    def priced_skus(self, skus: Iterable[str]) -> set:
+        """
+        The given SKUs that have any price entry at all, past, current or scheduled.
+        """
+        skus = list(dict.fromkeys(str(sku) for sku in skus))
+        found = set()
+        with Session(self.engine) as session:
+            for start in range(0, len(skus), MAX_SKUS_PER_QUERY):
+                batch = skus[start:start + MAX_SKUS_PER_QUERY]
+                found.update(session.scalars(select(PriceEntry.sku).where(PriceEntry.sku.in_(batch)).distinct()))
+        return found
+
+    def _query(self, skus: List[str], on: date) -> Dict[str, float]:
+        found = {}
+        with Session(self.engine) as session:
+            for start in range(0, len(skus), MAX_SKUS_PER_QUERY):
+                batch = skus[start:start + MAX_SKUS_PER_QUERY]
+                stmt = (
+                    select(PriceEntry.sku, PriceEntry.unit_price)
+                    .where(PriceEntry.sku.in_(batch), PriceEntry.effective_from <= on,
+                           or_(PriceEntry.effective_to.is_(None), PriceEntry.effective_to > on))
+                    .order_by(PriceEntry.sku, PriceEntry.effective_from)
+                )
+                # Ordered by start date, so the latest entry in effect wins
+                for sku, unit_price in session.execute(stmt):
+                    found[sku] = unit_price
+        return found
+
+    def get_prices(self, skus: Iterable[str], on: Optional[date] = None) -> Dict[str, float]:
+        """
+        Prices in effect on `on` (default today) for every SKU that has one.
+        SKUs without a price are left out (and cached as such).
+        """
+        on = on or date.today()
+        wanted = list(dict.fromkeys(str(sku) for sku in skus if sku))
+        now = time.monotonic()
+        with self._lock:
+            check_version = now - self._version_checked_at >= self.version_check_seconds
+        if check_version:
+            current_version = self.version()
+        with self._lock:
+            if check_version:
+                self._version_checked_at = now
+                if current_version != self._cache_version:
+                    self._cache.clear()
+                    self._cache_version = current_version
+            current_version = self._cache_version
+            prices = {}
+            for sku in wanted:
+                if (sku, on) in self._cache:
+                    self._cache.move_to_end((sku, on))
+                    prices[sku] = self._cache[(sku, on)]
+            missing = [sku for sku in wanted if sku not in prices]
+            self.hits += len(prices)
+            self.misses += len(missing)
+
+        if missing:
+            found = self._query(missing, on)
+            with self._lock:
+                if self._cache_version == current_version:
+                    for sku in missing:
+                        self._cache[(sku, on)] = found.get(sku)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            prices.update({sku: found.get(sku) for sku in missing})
+        return {sku: price for sku, price in prices.items() if price is not None}
+
+    def get_price(self, sku: str, on: Optional[date] = None) -> Optional[float]:
+        return self.get_prices([sku], on).get(str(sku))
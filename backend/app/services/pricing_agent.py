@@ -1,4 +1,7 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import asyncio
+from app.services.pricing_engine import PricingTable, DEFAULT_VOLUME_TIERS
+from app.services.price_book import PriceBook
 
 class PricingAgent:
     def __init__(self):
@@ -8,61 +11,109 @@ class PricingAgent:
             "logistics": 2000,
             "tax_rate": 0.18
         }
+        # (minimum line quantity, discount on material value)
+        self.volume_discount_tiers = list(DEFAULT_VOLUME_TIERS)
+
+        try:
+            self.price_book = PriceBook()
+        except Exception as e:
+            print(f"WARNING: Price book unavailable, using catalog prices: {e}")
+            self.price_book = None
 
     def calculate_pricing(self, technical_output: Dict) -> Dict:
         """
         Augments the technical output with pricing.
+        All lines are priced at once in a columnar PricingTable.
+        """
+        return self.price(technical_output)[0]
+
+    def price(self, technical_output: Dict) -> Tuple[Dict, PricingTable]:
+        """
+        calculate_pricing plus the PricingTable behind it, which callers keep to re-price the quote later.
         """
         line_items = technical_output.get("line_items", [])
-        total_project_value = 0
-        
-        priced_items = []
-        for item in line_items:
-            recommendation = item.get("recommendation", {})
-            sku = recommendation.get("sku")
-            
-            # Base Price
-            base_price = recommendation.get("price")
-            if not base_price:
-                base_price = self._get_price_for_sku(sku)
-            
-            # Quantity (Default to 1 if missing)
-            qty = item.get("requirement", {}).get("quantity", 1.0)
+        table = self.build_table(line_items)
+        priced_items = table.apply_to(line_items)
             
-            # Service Costs (Mock logic: if 'Test' in text, add cost)
-            service_cost = self.service_rates["testing"]
-            
-            # Line Total = (Unit Price * Qty) + Service Cost
-            line_total = (base_price * qty) + service_cost
-            
-            total_project_value += line_total
-            
-            # Add pricing info to the item
-            item["pricing"] = {
-                "unit_price": base_price,
-                "quantity": qty,
-                "service_add_ons": service_cost,
-                "total_price": line_total
-            }
-            priced_items.append(item)
-            
-        return {
+        result = {
             "line_items": priced_items,
-            "commercial_summary": {
-                "subtotal": total_project_value,
-                "tax": total_project_value * self.service_rates["tax_rate"],
-                "grand_total": total_project_value * (1 + self.service_rates["tax_rate"])
-            },
+            "commercial_summary": table.commercial_summary(),
             "technical_summary": technical_output.get("summary"),
             "strategic_analysis": technical_output.get("strategic_analysis")
         }
+        return result, table
 
-    def _get_price_for_sku(self, sku: str) -> float:
+    def reprice(self, result: Dict, table: PricingTable, delta: Dict) -> List[int]:
         """
-        Mock DB lookup
+        Applies a what-if delta to a priced quote in place, without re-running
+        the technical analysis. Quote-wide keys: tax_rate, margin, service_add_on.
+        Per-line keys map line index -> value: quantities, line_margins, line_add_ons.
+        Only the affected lines are re-priced and rewritten; totals are adjusted
+        by their difference. Returns the indices of the re-priced lines.
         """
-        price_db = {
-            "CABLE-A1": 4500.0,
-            "CABLE-B2": 850.0
-        }
-        return price_db.get(sku, 0.0)
+        per_line = ("quantities", "line_margins", "line_add_ons")
+        # Validate before touching the table so a bad delta changes nothing
+        for key in per_line:
+            for i in (delta.get(key) or {}):
+                if not 0 <= int(i) < len(table):
+                    raise IndexError(f"Line index {i} out of range (0-{len(table) - 1})")
+
+        changed = set()
+        all_rows = range(len(table))
+        if delta.get("margin") is not None:
+            changed.update(table.update(all_rows, margin=delta["margin"]).tolist())
+        if delta.get("service_add_on") is not None:
+            changed.update(table.update(all_rows, add_on=delta["service_add_on"]).tolist())
+        for key, field in (("quantities", "quantity"), ("line_margins", "margin"), ("line_add_ons", "add_on")):
+            values = delta.get(key) or {}
+            if values:
+                rows = [int(i) for i in values]
+                changed.update(table.update(rows, **{field: [values[i] for i in values]}).tolist())
+        if delta.get("tax_rate") is not None:
+            table.tax_rate = float(delta["tax_rate"])
+
+        rows = sorted(changed)
+        table.apply_to(result["line_items"], rows)
+        result["commercial_summary"] = table.commercial_summary()
+        return rows
+
+    def build_table(self, line_items: List[Dict]) -> PricingTable:
+        # Base Price: price book first (one query for the whole BOM), then the catalog price
+        skus = [item.get("recommendation", {}).get("sku") for item in line_items]
+        book_prices = self._get_prices_for_skus(skus)
+        unit_prices = []
+        for sku, item in zip(skus, line_items):
+            base_price = book_prices.get(sku)
+            if base_price is None:
+                base_price = item.get("recommendation", {}).get("price") or 0.0
+            else:
+                # The catalog price is only a seed value; show the price the quote is built on
+                item["recommendation"]["price"] = base_price
+            unit_prices.append(base_price)
+
+        # Service Costs (Mock logic: testing add-on on every line)
+        return PricingTable.from_line_items(
+            line_items,
+            unit_prices,
+            add_on=self.service_rates["testing"],
+            tiers=self.volume_discount_tiers,
+            tax_rate=self.service_rates["tax_rate"]
+        )
+
+    async def acalculate_pricing(self, technical_output: Dict) -> Dict:
+        """
+        Async entry point; pricing runs in a worker thread off the event loop.
+        """
+        return await asyncio.to_thread(self.calculate_pricing, technical_output)
+
+    def _get_prices_for_skus(self, skus: List[str]) -> Dict[str, float]:
+        """
+        Bulk price-book lookup; empty when the price book is unavailable.
+        """
+        if not self.price_book:
+            return {}
+        try:
+            return self.price_book.get_prices(skus)
+        except Exception as e:
+            print(f"WARNING: Price book lookup failed, using catalog prices: {e}")
+            return {}
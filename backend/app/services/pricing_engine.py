@@ -0,0 +1,134 @@
+from typing import List, Dict, Optional, Sequence, Tuple
+import numpy as np
+
+# Volume discount tiers on a line's material value: (minimum quantity, discount rate).
+# Lines below the first threshold get no discount.
+DEFAULT_VOLUME_TIERS: List[Tuple[float, float]] = [
+    (1000, 0.02),
+    (5000, 0.05),
+    (10000, 0.08),
+]
+
+
+def _as_float(value, default: float) -> float:
+    try:
+        return float(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+class PricingTable:
+    """
+    Columnar pricing for a BOM: one float64 array per input (unit price,
+    quantity, service add-on), with line totals, volume discounts, tax and the
+    grand total computed as whole-array operations instead of per-line Python.
+    Results are written back into the line item dicts in the existing shape.
+    A table kept with a job can be re-priced in place with update(), which
+    recomputes only the changed rows and adjusts the totals by their delta.
+    """
+    def __init__(self, unit_price: np.ndarray, quantity: np.ndarray, add_on: np.ndarray,
+                 tiers: Sequence[Tuple[float, float]] = DEFAULT_VOLUME_TIERS, tax_rate: float = 0.18,
+                 margin: Optional[np.ndarray] = None):
+        self.unit_price = np.asarray(unit_price, dtype=np.float64)
+        self.quantity = np.asarray(quantity, dtype=np.float64)
+        self.add_on = np.asarray(add_on, dtype=np.float64)
+        # Markup on the unit price per line (0.1 = +10%)
+        self.margin = np.zeros(len(self.unit_price)) if margin is None else np.asarray(margin, dtype=np.float64)
+        self.tax_rate = float(tax_rate)
+        tiers = sorted(tiers)
+        self.tier_thresholds = np.array([t[0] for t in tiers], dtype=np.float64)
+        # Rate for "below every threshold" first, then one per tier
+        self.tier_rates = np.array([0.0] + [t[1] for t in tiers], dtype=np.float64)
+        self.compute()
+
+    def __len__(self) -> int:
+        return len(self.unit_price)
+
+    @classmethod
+    def from_line_items(cls, line_items: List[Dict], unit_prices: Sequence[float], add_on: float,
+                        tiers: Sequence[Tuple[float, float]] = DEFAULT_VOLUME_TIERS,
+                        tax_rate: float = 0.18) -> "PricingTable":
+        """
+        `unit_prices` is resolved by the caller (recommendation or price book).
+        Quantity defaults to 1 when the requirement doesn't state one.
+        """
+        quantity = np.fromiter(
+            (_as_float(item.get("requirement", {}).get("quantity"), 1.0) for item in line_items),
+            dtype=np.float64, count=len(line_items)
+        )
+        unit_price = np.fromiter((_as_float(p, 0.0) for p in unit_prices), dtype=np.float64, count=len(line_items))
+        return cls(unit_price, quantity, np.full(len(line_items), float(add_on)), tiers, tax_rate)
+
+    def _discount_rates(self, quantity: np.ndarray) -> np.ndarray:
+        return self.tier_rates[np.searchsorted(self.tier_thresholds, quantity, side="right")]
+
+    def _line_values(self, unit_price, quantity, add_on, margin) -> tuple:
+        gross = unit_price * (1.0 + margin) * quantity
+        discount_rate = self._discount_rates(quantity)
+        discount = gross * discount_rate
+        # Line Total = (Unit Price * (1 + Margin) * Qty) - Volume Discount + Service Cost
+        return gross, discount_rate, discount, gross - discount + add_on
+
+    def compute(self):
+        self.gross, self.discount_rate, self.discount, self.line_total = self._line_values(
+            self.unit_price, self.quantity, self.add_on, self.margin
+        )
+        self.subtotal = float(self.line_total.sum())
+        self.discount_total = float(self.discount.sum())
+
+    def update(self, rows: Sequence[int], unit_price=None, quantity=None, add_on=None, margin=None) -> np.ndarray:
+        """
+        Sets new inputs (a scalar or one value per row) on the given rows and
+        re-prices just those rows. Returns the row numbers that were re-priced.
+        """
+        given = np.asarray(rows, dtype=np.int64)
+        if given.size and (given.min() < 0 or given.max() >= len(self)):
+            raise IndexError(f"Line index out of range (0-{len(self) - 1})")
+        for column, value in ((self.unit_price, unit_price), (self.quantity, quantity),
+                              (self.add_on, add_on), (self.margin, margin)):
+            if value is not None:
+                column[given] = value
+        rows = np.unique(given)
+        if rows.size == len(self):
+            self.compute()
+            return rows
+
+        old_total, old_discount = self.line_total[rows].sum(), self.discount[rows].sum()
+        gross, rate, discount, total = self._line_values(
+            self.unit_price[rows], self.quantity[rows], self.add_on[rows], self.margin[rows]
+        )
+        self.gross[rows], self.discount_rate[rows], self.discount[rows], self.line_total[rows] = gross, rate, discount, total
+        self.subtotal += float(total.sum() - old_total)
+        self.discount_total += float(discount.sum() - old_discount)
+        return rows
+
+    def commercial_summary(self) -> Dict:
+        tax = self.subtotal * self.tax_rate
+        return {
+            "subtotal": self.subtotal,
+            "volume_discount": self.discount_total,
+            "tax": tax,
+            "grand_total": self.subtotal + tax
+        }
+
+    def apply_to(self, line_items: List[Dict], rows: Optional[Sequence[int]] = None) -> List[Dict]:
+        """
+        Writes each line's pricing block into its item dict (all rows by default).
+        """
+        columns = [self.unit_price, self.margin, self.quantity, self.add_on, self.discount_rate, self.discount,
+                   self.line_total]
+        if rows is None:
+            rows = range(len(line_items))
+            columns = [c.tolist() for c in columns]
+        unit_price, margin, quantity, add_on, rate, discount, total = columns
+        for i in rows:
+            line_items[i]["pricing"] = {
+                "unit_price": float(unit_price[i]),
+                "margin": float(margin[i]),
+                "quantity": float(quantity[i]),
+                "service_add_ons": float(add_on[i]),
+                "volume_discount_rate": float(rate[i]),
+                "volume_discount": float(discount[i]),
+                "total_price": float(total[i])
+            }
+        return line_items
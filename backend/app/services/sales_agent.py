@@ -1,93 +1,121 @@
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Tuple
+import asyncio
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from app.services.portal_fetcher import PortalFetcher
+from app.services.tender_parser import iter_opportunities
 
 class SalesAgent:
-    def __init__(self):
-        self.target_urls = [
+    def __init__(self, target_urls: Optional[List[str]] = None, source_timeouts: Optional[Dict[str, float]] = None,
+                 fetcher: Optional[PortalFetcher] = None):
+        self.target_urls = target_urls or [
             "https://eprocure.gov.in/cppp/latestactivetenders",
             "https://www.ntpc.co.in/en/tenders/open-tenders",
             "https://www.powergrid.in/tenders"
         ]
+        # Per-portal timeout overrides in seconds; others use PORTAL_FETCH_TIMEOUT
+        self.source_timeouts = source_timeouts or {}
+        self.fetcher = fetcher or PortalFetcher()
 
     def scan_for_rfps(self) -> Dict:
         """
         Scans target sources for RFPs. 
         Uses Real HTML Parsing logic to extract tender details.
+        Blocking wrapper around ascan_for_rfps for scripts and worker threads.
         """
-        import requests
-        from bs4 import BeautifulSoup
-        
-        # 1. Hybrid Approach (Best for Demos):
-        # Step A: Prove we can hit the live internet (Real Network Call)
+        # A private fetcher with the same limits: its client is bound to this short-lived
+        # loop and closed with it, while self.fetcher stays open for the app's loop
+        shared = self.fetcher
+        fetcher = PortalFetcher(max_per_host=shared.max_per_host, max_connections=shared.max_connections,
+                                timeout=shared.timeout, retries=shared.retries, backoff=shared.backoff,
+                                deadline=shared.deadline)
+
+        async def scan():
+            try:
+                return await self.ascan_for_rfps(fetcher)
+            finally:
+                await fetcher.aclose()
+
         try:
-            # We hit a real URL to prove the backend has internet access
-            _ = requests.get("https://gem.gov.in/cppp", timeout=3)
-            print("DEBUG: Live Connectivity Check Passed.")
-        except Exception:
-            print("DEBUG: Live Connectivity Check Failed (Using offline mode).")
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(scan())
+        # Called from inside an event loop: run the scan on its own loop in a worker thread
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, scan()).result()
 
-        # Step B: Load the "Snapshot" HTML so the Parser actually finds data
-        # (This avoids the demo failing due to CAPTCHAs or changed structure on the live gov site)
-        html_content = self._get_mock_website_html()
-        
-        # 2. Parse HTML (The "Real" Logic)
-        soup = BeautifulSoup(html_content, 'html.parser')
-        rows = soup.find_all('tr', class_='tender-row')
-        
+    async def ascan_for_rfps(self, fetcher: Optional[PortalFetcher] = None) -> Dict:
+        """
+        Fetches every target portal concurrently over the shared pooled client
+        (or `fetcher`) and parses each listing as soon as it arrives, so a scan
+        takes as long as the slowest portal rather than the sum of all of them.
+        Parsing runs in a worker thread to keep the event loop free.
+        """
+        fetcher = fetcher or self.fetcher
+        t0 = time.perf_counter()
+        sources = [{"url": url, "timeout": self.source_timeouts.get(url)} for url in self.target_urls]
         found_opportunities = []
-        today = datetime.now()
-        
-        for row in rows:
-            cols = row.find_all('td')
-            if len(cols) < 5: continue
-            
-            # Extract Data from HTML
-            t_id = cols[0].text.strip()
-            title = cols[1].text.strip()
-            pub_date_str = cols[2].text.strip()
-            due_date_str = cols[3].text.strip()
-            link = cols[4].find('a')['href']
-            
-            # Calculate Risk/Fit (Consulting Logic on top of Scraping)
-            due_dt = datetime.strptime(due_date_str, "%Y-%m-%d")
-            days_left = (due_dt - today).days
-            
-            risk = "Low"
-            action = "REVIEW"
-            if days_left < 7:
-                risk = "HIGH (Urgent)"
-                action = "EXPEDITE"
-                
-            # Randomize Fit Score for demo variety
-            # In real app, we'd scan the Title keywords against our capabilities
-            fit_score = 90 if "XLPE" in title else (75 if "Control" in title else 40)
-            
-            opp = {
-                "id": t_id,
-                "title": title,
-                "source": "eprocure.gov.in (Snapshot)",
-                "publish_date": pub_date_str,
-                "due_date": due_date_str,
-                "status": "OPEN",
-                "match_score": fit_score,
-                "url": link,
-                "submission_risk": f"{risk} ({days_left} days left)",
-                "strategic_fit": "High" if fit_score > 80 else "Low",
-                "right_to_win_score": fit_score - 5, # Mock calc
-                "action": action
-            }
-            found_opportunities.append(opp)
+        rows_parsed = 0
+        fetch_report = []
+        async for result in fetcher.fetch_all(sources):
+            fetch_report.append(result.to_dict())
+            if not result.ok:
+                print(f"DEBUG: Portal fetch failed for {result.url}: {result.error or result.status}")
+                continue
+            source = urlsplit(result.url).netloc
+            in_window, parsed = await asyncio.to_thread(self._parse_listing, result.text, source)
+            found_opportunities.extend(in_window)
+            rows_parsed += parsed
 
+        if not rows_parsed:
+            # Load the "Snapshot" HTML so the Parser actually finds data
+            # (This avoids the demo failing due to CAPTCHAs or changed structure on the live gov site)
+            print("DEBUG: No tenders parsed from live portals (Using snapshot).")
+            found_opportunities, _ = self._parse_listing(self._get_mock_website_html(), "eprocure.gov.in (Snapshot)")
+
+        result = self._scan_result(found_opportunities)
+        result["fetch_report"] = fetch_report
+        result["scan_seconds"] = round(time.perf_counter() - t0, 3)
+        return result
+
+    async def aclose(self):
+        await self.fetcher.aclose()
+
+    def _parse_listing(self, html_content: str, source: str) -> Tuple[List[Dict], int]:
+        """
+        Parses a tender listing page (rows of class 'tender-row') with the
+        configured parser backend. Returns the opportunities due within the
+        next 90 days and the number of rows parsed.
+        """
+        return self._due_within_window(iter_opportunities(html_content, source))
+
+    @staticmethod
+    def _due_within_window(pairs: Iterable[Tuple[Dict, datetime]]) -> Tuple[List[Dict], int]:
         # 3. Filter: Next 3 Months Logic
+        # Rows come off the parser one at a time and only those in the window are kept
+        today = datetime.now()
         cutoff_date = today + timedelta(days=90)
-        valid_opportunities = []
-        
-        for opp in found_opportunities:
-            due_dt = datetime.strptime(opp["due_date"], "%Y-%m-%d")
+        in_window, parsed = [], 0
+        # Due dates were parsed once by the listing parser
+        for opp, due_dt in pairs:
+            parsed += 1
             # Filter Logic: Must be in future AND before cutoff
             if today <= due_dt <= cutoff_date:
-                valid_opportunities.append(opp)
+                in_window.append(opp)
+        return in_window, parsed
+
+    def _scan_result(self, found_opportunities: List[Dict]) -> Dict:
+        valid_opportunities = []
+        seen_ids = set()
+        for opp in found_opportunities:
+            # The same tender can be listed on more than one portal
+            if opp["id"] in seen_ids:
+                continue
+            valid_opportunities.append(opp)
+            seen_ids.add(opp["id"])
 
         return {
             "last_scanned": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -0,0 +1,155 @@
+import re
+from typing import List, Dict, Optional
+from app.services.pdf_processor import PDFDocument
+
+# Sections that carry the actual line items. Everything else in a tender pack
+# (instructions to bidders, GCC/SCC, forms) is boilerplate for extraction purposes.
+SECTION_KEYWORDS = {
+    "scope_of_work": ["scope of work", "scope of supply", "scope of the work", "scope of contract"],
+    "bill_of_quantities": ["bill of quantities", "bill of quantity", "boq", "schedule of quantities",
+                           "price schedule", "schedule of requirements", "price bid"],
+    "technical_specification": ["technical specification", "technical specifications",
+                                "technical requirements", "technical particulars"],
+}
+
+# Weak evidence from body text, for pages where the section has no detectable heading
+BODY_KEYWORD_WEIGHT = 0.5
+MAX_SECTION_PAGES = 15
+
+
+def _score_text(text: str) -> Dict[str, float]:
+    lowered = text.lower()
+    scores = {}
+    for kind, keywords in SECTION_KEYWORDS.items():
+        hits = sum(1 for kw in keywords if re.search(r"\b" + re.escape(kw) + r"\b", lowered))
+        if hits:
+            scores[kind] = float(hits)
+    return scores
+
+
+# Line-item vocabulary, for ranking chunks that have no section heading of their own
+LINE_ITEM_RE = re.compile(r"\b(?:qty|quantity|nos|sqmm|kv|core|cable|supply|meters?|rmt)\b", re.IGNORECASE)
+
+
+def relevance_score(text: str) -> float:
+    """
+    How likely a chunk of RFP text is to contain line items: section keywords
+    weigh most, line-item vocabulary adds density per 1k characters.
+    """
+    if not text:
+        return 0.0
+    section_hits = sum(_score_text(text).values())
+    item_density = len(LINE_ITEM_RE.findall(text)) * 1000.0 / len(text)
+    return section_hits * 2.0 + item_density
+
+
+class Section:
+    def __init__(self, kind: str, title: str, start_page: int, end_page: int, score: float):
+        self.kind = kind
+        self.title = title
+        self.start_page = start_page  # 0-based, inclusive
+        self.end_page = end_page  # 0-based, inclusive
+        self.score = score
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "title": self.title,
+            "pages": [self.start_page + 1, self.end_page + 1],
+            "score": round(self.score, 2)
+        }
+
+
+class SectionIndex:
+    """
+    Locates the Scope of Work / BOQ / Technical Specification pages of an RFP
+    from heading font sizes and keyword scoring, so only those pages are sent to the LLM.
+    """
+    def __init__(self, sections: List[Section], page_count: int):
+        self.sections = sections
+        self.page_count = page_count
+
+    @classmethod
+    def build(cls, document: PDFDocument, min_score: float = 1.0) -> "SectionIndex":
+        page_count = document.page_count
+        body_sizes = [document.page_layout(p)["body_size"] for p in range(page_count)]
+        sizes = sorted(s for s in body_sizes if s)
+        doc_body_size = sizes[len(sizes) // 2] if sizes else 0.0
+
+        # 1. Collect every heading with its page, so section ends can be found
+        headings = []
+        for page_no in range(page_count):
+            for heading in document.page_layout(page_no)["headings"]:
+                headings.append((page_no, heading))
+
+        # 2. Score headings; large and bold headings are stronger evidence
+        starts = []
+        for idx, (page_no, heading) in enumerate(headings):
+            scores = _score_text(heading["text"])
+            if not scores:
+                continue
+            weight = 2.0
+            if doc_body_size and heading["size"] >= doc_body_size * 1.2:
+                weight += 1.0
+            if heading["bold"] or heading["text"].isupper():
+                weight += 0.5
+            for kind, hits in scores.items():
+                starts.append((idx, page_no, kind, heading, hits * weight))
+
+        # 3. Body text keyword hits on pages without a matching heading
+        heading_pages = {page_no for _, page_no, _, _, _ in starts}
+        for page_no in range(page_count):
+            if page_no in heading_pages:
+                continue
+            for kind, hits in _score_text(document.page_text(page_no)).items():
+                score = hits * BODY_KEYWORD_WEIGHT
+                if score >= min_score:
+                    starts.append((None, page_no, kind, {"text": kind.replace("_", " ").title(), "size": 0.0}, score))
+
+        # 4. A section runs until the next heading at least as large as its own, capped in length
+        sections = []
+        for idx, page_no, kind, heading, score in starts:
+            if score < min_score:
+                continue
+            end_page = min(page_no + MAX_SECTION_PAGES - 1, page_count - 1)
+            if idx is not None:
+                for next_page, next_heading in headings[idx + 1:]:
+                    if next_page > page_no and next_heading["size"] >= heading["size"] \
+                            and not _score_text(next_heading["text"]):
+                        end_page = min(end_page, next_page - 1)
+                        break
+            else:
+                end_page = page_no
+            sections.append(Section(kind, heading["text"], page_no, end_page, score))
+
+        sections.sort(key=lambda s: s.score, reverse=True)
+        return cls(sections, page_count)
+
+    def relevant_pages(self, kinds: Optional[List[str]] = None) -> List[int]:
+        """
+        Sorted, de-duplicated 0-based page numbers covered by the detected sections.
+        """
+        pages = set()
+        for section in self.sections:
+            if kinds and section.kind not in kinds:
+                continue
+            pages.update(range(section.start_page, section.end_page + 1))
+        return sorted(pages)
+
+    def page_ranges(self) -> List[List[int]]:
+        """
+        Relevant pages collapsed into 1-based [start, end] ranges, for reporting.
+        """
+        ranges = []
+        for page_no in self.relevant_pages():
+            if ranges and ranges[-1][1] == page_no:
+                ranges[-1][1] = page_no + 1
+            else:
+                ranges.append([page_no + 1, page_no + 1])
+        return ranges
+
+    def to_dict(self) -> Dict:
+        return {
+            "sections": [s.to_dict() for s in self.sections],
+            "relevant_page_ranges": self.page_ranges()
+        }
@@ -0,0 +1,331 @@
+import json
+import re
+from enum import IntEnum
+from typing import List, Dict, Optional
+import numpy as np
+from app.services.spec_parser import parse_specs
+
+
+class Insulation(IntEnum):
+    UNKNOWN = 0
+    XLPE = 1
+    PVC = 2
+    EPR = 3
+    LSZH = 4
+
+
+class Armouring(IntEnum):
+    UNKNOWN = 0
+    UNARMOURED = 1
+    STRIP = 2
+    WIRE = 3
+    ARMOURED = 4  # Armoured, type not stated
+
+
+# Comparison results per candidate and spec
+MATCH = 1
+MISMATCH = 0
+NOT_COMPARABLE = -1
+
+NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+INSULATION_ALIASES = {
+    "xlpe": Insulation.XLPE, "pvc": Insulation.PVC, "hr-pvc": Insulation.PVC, "hrpvc": Insulation.PVC,
+    "epr": Insulation.EPR, "lszh": Insulation.LSZH, "frls": Insulation.PVC,
+}
+ARMOUR_ALIASES = [
+    ("unarm", Armouring.UNARMOURED), ("strip", Armouring.STRIP),
+    ("wire", Armouring.WIRE), ("armour", Armouring.ARMOURED), ("armor", Armouring.ARMOURED),
+]
+ARMOURED_TYPES = [Armouring.STRIP, Armouring.WIRE, Armouring.ARMOURED]
+
+# Voltage bands used to pre-filter the catalog: (name, exclusive lower kV, inclusive upper kV)
+VOLTAGE_BANDS = [
+    ("LV", 0.0, 1.1),
+    ("MV", 1.1, 33.0),
+    ("HV", 33.0, float("inf")),
+]
+# Normalized fields; raw specs with these names are not flattened over them
+NORMALIZED_FIELDS = ("kv", "cores", "sqmm", "insulation", "armouring")
+
+
+def _parse_kv(value) -> Optional[float]:
+    """
+    "11kV" -> 11.0, "1.1 kV" -> 1.1, "1100V" -> 1.1, "6.35/11kV" -> 11.0 (rated U, not Uo).
+    """
+    text = str(value).lower().replace(" ", "")
+    numbers = [float(n) for n in NUMBER_RE.findall(text)]
+    if not numbers:
+        return None
+    kv = max(numbers)
+    if "kv" not in text and text.endswith("v"):
+        kv = kv / 1000.0
+    return kv
+
+
+def _parse_number(value) -> Optional[float]:
+    m = NUMBER_RE.search(str(value))
+    return float(m.group(0)) if m else None
+
+
+def _parse_insulation(value) -> Insulation:
+    text = str(value).lower()
+    for alias, code in INSULATION_ALIASES.items():
+        if alias in text:
+            return code
+    return Insulation.UNKNOWN
+
+
+def _parse_armouring(value) -> Armouring:
+    text = str(value).lower()
+    for alias, code in ARMOUR_ALIASES:
+        if alias in text:
+            return code
+    return Armouring.UNKNOWN
+
+
+def normalize_specs(specs: Optional[Dict], text: str = "") -> Dict:
+    """
+    Typed, normalized spec fields from a free-form specs dict. Values missing
+    from `specs` are filled in from `text` (e.g. the product or item name).
+    Missing numbers are None, missing enums are UNKNOWN.
+    """
+    specs = dict(specs or {})
+    if text:
+        for key, value in parse_specs(text).items():
+            specs.setdefault(key, value)
+
+    def field(*keys):
+        for key in keys:
+            if specs.get(key) not in (None, ""):
+                return specs[key]
+        return None
+
+    voltage = field("voltage", "kv")
+    cores = field("cores", "core")
+    sqmm = field("sqmm", "cross_section", "size")
+    insulation = field("insulation")
+    armouring = field("armouring", "armour", "armoring")
+    return {
+        "kv": _parse_kv(voltage) if voltage is not None else None,
+        # Kept fractional: 3.5 core cables are common in LT distribution
+        "cores": _parse_number(cores) if cores is not None else None,
+        "sqmm": _parse_number(sqmm) if sqmm is not None else None,
+        "insulation": _parse_insulation(insulation) if insulation is not None else Insulation.UNKNOWN,
+        "armouring": _parse_armouring(armouring) if armouring is not None else Armouring.UNKNOWN,
+    }
+
+
+def spec_metadata(normalized: Dict) -> Dict:
+    """
+    Flat primitive metadata fields for Chroma. Unknown values are omitted since Chroma rejects None.
+    """
+    meta = {}
+    for key in ("kv", "cores", "sqmm"):
+        if normalized[key] is not None:
+            meta[f"spec_{key}"] = float(normalized[key])
+    if normalized["insulation"] != Insulation.UNKNOWN:
+        meta["spec_insulation"] = normalized["insulation"].name
+    if normalized["armouring"] != Armouring.UNKNOWN:
+        meta["spec_armouring"] = normalized["armouring"].name
+    return meta
+
+
+def flat_spec_metadata(specs: Optional[Dict]) -> Dict:
+    """
+    Raw primitive specs as spec_<key> fields (e.g. spec_voltage, spec_type), so
+    every spec can be used in a `where` filter. Normalized fields take precedence.
+    """
+    meta = {}
+    for key, value in (specs or {}).items():
+        key = str(key).strip().lower().replace(" ", "_")
+        if key in NORMALIZED_FIELDS or value is None or isinstance(value, (dict, list)):
+            continue
+        meta[f"spec_{key}"] = value
+    return meta
+
+
+def voltage_band(kv: Optional[float]) -> Optional[tuple]:
+    if kv is None:
+        return None
+    for band in VOLTAGE_BANDS:
+        if band[1] < kv <= band[2]:
+            return band
+    return None
+
+
+def requirement_filter(normalized: Dict, category: Optional[str] = None) -> Optional[Dict]:
+    """
+    Chroma `where` clause narrowing the catalog to products that can satisfy a
+    requirement: its category, the voltage band of its kV rating and its
+    insulation. Returns None when the requirement carries nothing to filter on.
+    Cable requirements default to the "Cable" category.
+    """
+    clauses = []
+    band = voltage_band(normalized["kv"])
+    if category is None and (band or normalized["insulation"] != Insulation.UNKNOWN):
+        category = "Cable"
+    if category:
+        clauses.append({"category": category})
+    if band:
+        clauses.append({"spec_kv": {"$gt": band[1]}})
+        if band[2] != float("inf"):
+            clauses.append({"spec_kv": {"$lte": band[2]}})
+    if normalized["insulation"] != Insulation.UNKNOWN:
+        clauses.append({"spec_insulation": normalized["insulation"].name})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _from_metadata(meta: Dict) -> Dict:
+    """
+    Normalized specs for a stored product: the flat spec_* fields written at ingest,
+    or a one-off parse of the legacy JSON `specs` string for older rows.
+    """
+    if "spec_kv" in meta or "spec_insulation" in meta or "spec_cores" in meta:
+        return {
+            "kv": meta.get("spec_kv"),
+            "cores": meta.get("spec_cores"),
+            "sqmm": meta.get("spec_sqmm"),
+            "insulation": Insulation[meta["spec_insulation"]] if "spec_insulation" in meta else Insulation.UNKNOWN,
+            "armouring": Armouring[meta["spec_armouring"]] if "spec_armouring" in meta else Armouring.UNKNOWN,
+        }
+    specs = meta.get("specs", {})
+    if isinstance(specs, str):
+        try:
+            specs = json.loads(specs)
+        except ValueError:
+            specs = {}
+    return normalize_specs(specs, meta.get("name", ""))
+
+
+class SpecIndex:
+    """
+    Columnar index of normalized cable specs for the whole catalog: one NumPy
+    array per field, one row per SKU. Candidates are compared against a
+    requirement with array operations instead of per-candidate string tests.
+    """
+    def __init__(self, skus: List[str], kv: np.ndarray, cores: np.ndarray, sqmm: np.ndarray,
+                 insulation: np.ndarray, armouring: np.ndarray):
+        self.skus = skus
+        self.row_of = {sku: i for i, sku in enumerate(skus)}
+        self.kv = kv
+        self.cores = cores
+        self.sqmm = sqmm
+        self.insulation = insulation
+        self.armouring = armouring
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    @classmethod
+    def from_metadatas(cls, metadatas: List[Dict]) -> "SpecIndex":
+        n = len(metadatas)
+        kv = np.full(n, np.nan, dtype=np.float32)
+        cores = np.full(n, np.nan, dtype=np.float32)
+        sqmm = np.full(n, np.nan, dtype=np.float32)
+        insulation = np.zeros(n, dtype=np.int8)
+        armouring = np.zeros(n, dtype=np.int8)
+        skus = []
+        for i, meta in enumerate(metadatas):
+            skus.append(str(meta.get("sku")))
+            norm = _from_metadata(meta)
+            if norm["kv"] is not None:
+                kv[i] = norm["kv"]
+            if norm["cores"] is not None:
+                cores[i] = norm["cores"]
+            if norm["sqmm"] is not None:
+                sqmm[i] = norm["sqmm"]
+            insulation[i] = norm["insulation"]
+            armouring[i] = norm["armouring"]
+        return cls(skus, kv, cores, sqmm, insulation, armouring)
+
+    @classmethod
+    def from_collection(cls, collection, page_size: int = 10000) -> "SpecIndex":
+        """
+        Builds the index from a Chroma collection page by page, so only one page
+        of metadata dicts is held at a time.
+        """
+        parts = []
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            if not len(page["ids"]):
+                break
+            parts.append(cls.from_metadatas(page["metadatas"] or []))
+            offset += len(page["ids"])
+        if not parts:
+            return cls.from_metadatas([])
+        return cls(
+            [sku for part in parts for sku in part.skus],
+            *(np.concatenate([getattr(part, field) for part in parts])
+              for field in NORMALIZED_FIELDS)
+        )
+
+    def rows(self, skus: List[str]) -> np.ndarray:
+        """
+        Row numbers for the given SKUs; -1 for SKUs not in the index.
+        """
+        return np.array([self.row_of.get(str(sku), -1) for sku in skus], dtype=np.int64)
+
+    def compare(self, requirement: Dict, rows: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Compares a normalized requirement against the given rows (default: whole catalog).
+        Returns one int8 array per spec with MATCH / MISMATCH / NOT_COMPARABLE per row.
+        Rows of -1 (unknown SKU) are NOT_COMPARABLE throughout.
+        """
+        if rows is None:
+            rows = np.arange(len(self.skus))
+        known = rows >= 0
+        safe_rows = np.where(known, rows, 0)
+
+        def numeric(column: np.ndarray, value: Optional[float], rtol: float) -> np.ndarray:
+            out = np.full(len(rows), NOT_COMPARABLE, dtype=np.int8)
+            if value is None or not len(column):
+                return out
+            cand = column[safe_rows]
+            comparable = known & ~np.isnan(cand)
+            out[comparable] = np.isclose(cand[comparable], value, rtol=rtol, atol=1e-6).astype(np.int8)
+            return out
+
+        def enum(column: np.ndarray, value: int, equivalent=None) -> np.ndarray:
+            out = np.full(len(rows), NOT_COMPARABLE, dtype=np.int8)
+            if value == 0 or not len(column):
+                return out
+            cand = column[safe_rows]
+            comparable = known & (cand != 0)
+            matched = cand == value
+            if equivalent is not None:
+                matched |= equivalent(cand)
+            out[comparable] = matched[comparable].astype(np.int8)
+            return out
+
+        armour = requirement["armouring"]
+        armoured_codes = np.array([int(a) for a in ARMOURED_TYPES], dtype=np.int8)
+
+        def armour_equivalent(cand: np.ndarray) -> np.ndarray:
+            # A generic "Armoured" on either side is satisfied by any armoured construction
+            if armour == Armouring.ARMOURED:
+                return np.isin(cand, armoured_codes)
+            if armour in ARMOURED_TYPES:
+                return cand == int(Armouring.ARMOURED)
+            return np.zeros(len(cand), dtype=bool)
+
+        return {
+            "kv": numeric(self.kv, requirement["kv"], rtol=0.01),
+            "cores": numeric(self.cores, requirement["cores"], rtol=0.0),
+            "sqmm": numeric(self.sqmm, requirement["sqmm"], rtol=0.01),
+            "insulation": enum(self.insulation, int(requirement["insulation"])),
+            "armouring": enum(self.armouring, int(armour), armour_equivalent),
+        }
+
+    def display_value(self, field: str, row: int) -> str:
+        if field == "kv":
+            return f"{float(self.kv[row]):g}kV"
+        if field == "cores":
+            return f"{float(self.cores[row]):g}"
+        if field == "sqmm":
+            return f"{float(self.sqmm[row]):g} sqmm"
+        if field == "insulation":
+            return Insulation(int(self.insulation[row])).name
+        return Armouring(int(self.armouring[row])).name.title()
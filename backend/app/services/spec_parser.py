@@ -0,0 +1,38 @@
+import re
+from typing import Dict
+
+VOLTAGE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*k\s?v\b", re.IGNORECASE)
+CORES_RE = re.compile(r"\b(\d{1,2}(?:\.\d)?)\s*(?:c\b|core|cores\b|\s*[cC]?\s*[x×]\s*\d)", re.IGNORECASE)
+SQMM_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:sq\.?\s*mm|sqmm|mm2|mm²|sq\.?mm)", re.IGNORECASE)
+INSULATION_RE = re.compile(r"\b(XLPE|HR-?PVC|PVC|EPR|LSZH|FRLS)\b", re.IGNORECASE)
+ARMOUR_PATTERNS = [
+    ("Unarmoured", re.compile(r"\bun-?armou?red\b", re.IGNORECASE)),
+    ("Strip", re.compile(r"\bstrip\b", re.IGNORECASE)),
+    ("Wire", re.compile(r"\b(?:round\s+)?wire\s+armou?r", re.IGNORECASE)),
+    ("Armoured", re.compile(r"\barmou?red\b", re.IGNORECASE)),
+]
+
+
+def parse_specs(text: str) -> Dict[str, str]:
+    """
+    Pulls cable specs out of a free-text line item, in the same string
+    format the LLM returns (e.g. voltage "11kV", cores "3").
+    """
+    specs = {}
+    m = VOLTAGE_RE.search(text)
+    if m:
+        specs["voltage"] = f"{m.group(1)}kV"
+    m = INSULATION_RE.search(text)
+    if m:
+        specs["insulation"] = m.group(1).upper()
+    m = CORES_RE.search(text)
+    if m:
+        specs["cores"] = m.group(1)
+    m = SQMM_RE.search(text)
+    if m:
+        specs["sqmm"] = m.group(1)
+    for label, pattern in ARMOUR_PATTERNS:
+        if pattern.search(text):
+            specs["armouring"] = label
+            break
+    return specs
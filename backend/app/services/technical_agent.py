@@ -1,7 +1,18 @@
 import os
 import json
-from typing import List, Dict
-from app.services.pdf_processor import PDFProcessor
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Union
+from app.services.pdf_processor import PDFProcessor, PDFDocument
+from app.services.section_index import SectionIndex, relevance_score
+from app.services.ocr_processor import OCRProcessor
+from app.services.boq_extractor import BOQExtractor
+from app.services.chunking import chunk_units, chunk_pages
+from app.services.llm_cache import LLMResponseCache
+from app.services.spec_index import normalize_specs, requirement_filter, MATCH, MISMATCH, NOT_COMPARABLE
+from app.services.token_budget import TokenBudget, count_tokens
 from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
@@ -16,6 +27,7 @@ class CableSpec(BaseModel):
 
 class RFPItem(BaseModel):
     name: str = Field(description="Name of the item")
+    quantity: Optional[float] = Field(default=None, description="Required quantity as a number")
     specs: CableSpec
 
 class RFPExtraction(BaseModel):
@@ -25,8 +37,21 @@ from app.core.config import settings
 
 from app.services.vector_store import ProductVectorDB
 
+# Spec fields shown in the comparison table, in display order
+SPEC_LABELS = [
+    ("kv", "Voltage"),
+    ("insulation", "Insulation"),
+    ("cores", "Cores"),
+    ("sqmm", "Cross Section"),
+    ("armouring", "Armouring"),
+]
+# Match score points lost per spec that contradicts an explicit requirement
+SPEC_MISMATCH_PENALTY = 15
+
 class TechnicalAgent:
-    def __init__(self):
+    MODEL_NAME = "llama-3.3-70b-versatile"
+
+    def __init__(self, vector_db: Optional[ProductVectorDB] = None):
         # Initialize Groq
         api_key = settings.GROQ_API_KEY
         print(f"DEBUG: TechnicalAgent initializing. Groq Key present: {bool(api_key)}")
@@ -34,92 +59,226 @@ class TechnicalAgent:
             print("WARNING: GROQ_API_KEY not found in settings. Agent will use Fallback/Mock mode.")
             self.llm = None
         else:
-            self.llm = ChatGroq(model_name="llama-3.3-70b-versatile", groq_api_key=api_key, temperature=0)
+            self.llm = self._make_llm()
             print("DEBUG: Groq LLM initialized successfully.")
+        # ChatGroq's async connection pool is bound to the event loop that first uses it,
+        # and jobs run on their own loops, so every loop gets its own client
+        self._loop_llms = weakref.WeakKeyDictionary()
+        self._loop_llms_lock = threading.Lock()
 
-        # Initialize Real Vector DB
-        try:
-            self.vector_db = ProductVectorDB()
-            print("DEBUG: ChromaDB Vector Store initialized.")
-        except Exception as e:
-            print(f"WARNING: Vector DB failed to load: {e}")
-            self.vector_db = None
+        # Raw responses are cached per chunk so re-runs and corrigenda skip unchanged sections
+        self.llm_cache = None
+        if settings.LLM_CACHE_ENABLED:
+            try:
+                self.llm_cache = LLMResponseCache()
+            except Exception as e:
+                print(f"WARNING: LLM response cache unavailable: {e}")
+
+        # Initialize Real Vector DB (shared instance when provided by the AgentRegistry)
+        if vector_db is not None:
+            self.vector_db = vector_db
+        else:
+            try:
+                self.vector_db = ProductVectorDB()
+                print("DEBUG: ChromaDB Vector Store initialized.")
+            except Exception as e:
+                print(f"WARNING: Vector DB failed to load: {e}")
+                self.vector_db = None
+
+    def _make_llm(self) -> ChatGroq:
+        return ChatGroq(model_name=self.MODEL_NAME, groq_api_key=settings.GROQ_API_KEY, temperature=0)
 
-    def process_rfp(self, file_content: bytes) -> Dict:
+    def _llm_for_running_loop(self) -> ChatGroq:
+        loop = asyncio.get_running_loop()
+        with self._loop_llms_lock:
+            llm = self._loop_llms.get(loop)
+            if llm is None:
+                llm = self._loop_llms[loop] = self._make_llm()
+        return llm
+
+    def process_rfp(self, source: Union[str, bytes]) -> Dict:
+        """
+        `source` is the path of a spooled upload, or raw bytes for the simulated demo pipelines.
+        """
         print("DEBUG: process_rfp called. Starting PDF extraction...")
         # 1. Extraction
-        if file_content.startswith(b"Simulated PDF Content"):
+        if self._is_simulated(source):
             # BYPASS PDF EXTRACTOR for Magic Run Demo
-            full_text = file_content.decode('utf-8')
-            # Simulated extracted text to prompt LLM correctly
-            # We add diverse line items to show "Deep Analysis"
-            full_text += """
+            return self._process_simulated(source)
+
+        with PDFProcessor.open(source) as document:
+            return self.process_document(document)
+
+    async def aprocess_rfp(self, source: Union[str, bytes]) -> Dict:
+        """
+        Async entry point for request handlers. PDF parsing, OCR and vector search
+        run in worker threads and the LLM is called with ainvoke, so the event
+        loop stays free for other clients while an RFP is analysed.
+        """
+        print("DEBUG: aprocess_rfp called. Starting PDF extraction...")
+        if self._is_simulated(source):
+            return await asyncio.to_thread(self._process_simulated, source)
+
+        document = await asyncio.to_thread(PDFProcessor.open, source)
+        try:
+            prepared = await asyncio.to_thread(self._prepare_document, document)
+            if "result" in prepared:
+                return prepared["result"]
+            llm_items = []
+            if prepared["llm_chunks"]:
+                llm_items = await self._aextract_chunks(prepared["llm_chunks"], prepared["extraction_stats"])
+            return await asyncio.to_thread(self._finish_document, document, prepared, llm_items)
+        finally:
+            document.close()
+
+    def process_document(self, document: PDFDocument) -> Dict:
+        """
+        Runs the analysis against an already-open PDFDocument.
+        Every stage reads pages through the same handle; the caller owns closing it.
+        """
+        prepared = self._prepare_document(document)
+        if "result" in prepared:
+            return prepared["result"]
+        llm_items = []
+        if prepared["llm_chunks"]:
+            llm_items = self._extract_chunks_with_ai(prepared["llm_chunks"], prepared["extraction_stats"])
+        return self._finish_document(document, prepared, llm_items)
+
+    @staticmethod
+    def _is_simulated(source: Union[str, bytes]) -> bool:
+        return isinstance(source, bytes) and source.startswith(b"Simulated PDF Content")
+
+    def _prepare_document(self, document: PDFDocument) -> Dict:
+        """
+        Everything before the LLM call: extraction, OCR, section index, BOQ tables.
+        Returns {"result": ...} when the document can't be analysed, otherwise the
+        intermediate state plus the chunks (if any) that still need the LLM.
+        """
+        # Large tender packs are worth extracting up-front in a process pool.
+        # Heading layout is collected in the same pass for the section index.
+        document.load_all(
+            parallel_min_pages=settings.PDF_PARALLEL_MIN_PAGES,
+            max_workers=settings.PDF_MAX_WORKERS or None,
+            with_layout=True
+        )
+        print(f"DEBUG: PDF has {document.page_count} pages ({document.extraction_mode} extraction).")
+
+        # Scanned pages have no text layer; OCR just those and merge them back in page order
+        ocr_stats = None
+        scanned_pages = OCRProcessor.pages_without_text(document)
+        if scanned_pages and settings.OCR_ENABLED:
+            if OCRProcessor.is_available():
+                ocr_stats = OCRProcessor().ocr_document(document, scanned_pages)
+                print(f"DEBUG: OCR stats: {ocr_stats}")
+            else:
+                print("WARNING: Pages without a text layer found but tesseract/poppler are not installed.")
+
+        if not document.has_text(min_chars=50):
+            return {"result": {
+                "summary": "Error: PDF seems empty or is a scanned image and OCR produced no usable text.",
+                "line_items": [],
+                "raw_text_snippet": "EMPTY_TEXT"
+            }}
+
+        # Only Scope of Work / BOQ / Technical Specification pages go to the LLM
+        section_index = SectionIndex.build(document)
+        relevant_pages = section_index.relevant_pages()
+        if relevant_pages:
+            print(f"DEBUG: Section index selected pages {section_index.page_ranges()} of {document.page_count}.")
+        else:
+            print("DEBUG: No Scope/BOQ sections detected, using the whole document.")
+
+        # 2a. Deterministic BOQ table parsing (fast path, no tokens spent)
+        boq = BOQExtractor.extract(document, relevant_pages)
+        extraction_stats = {**boq.stats(), "llm_items": 0, "llm_called": False}
+        print(f"DEBUG: BOQ tables resolved {len(boq.items)} items, {len(boq.unresolved_rows)} rows left for the LLM.")
+
+        # 2b. AI Extraction, only for what the table parser could not resolve
+        llm_chunks = None
+        needs_llm = not boq.items or bool(boq.unresolved_rows)
+        if needs_llm and self.llm:
+            if boq.items:
+                llm_chunks = chunk_units(
+                    [row + "\n" for row in boq.unresolved_rows],
+                    settings.LLM_CHUNK_CHARS, settings.LLM_CHUNK_OVERLAP_CHARS
+                )
+            else:
+                llm_chunks = chunk_pages(
+                    document, relevant_pages, settings.LLM_CHUNK_CHARS, settings.LLM_CHUNK_OVERLAP_CHARS
+                )
+            extraction_stats["llm_called"] = True
+
+        return {
+            "ocr_stats": ocr_stats,
+            "section_index": section_index,
+            "boq": boq,
+            "extraction_stats": extraction_stats,
+            "llm_chunks": llm_chunks
+        }
+
+    def _finish_document(self, document: PDFDocument, prepared: Dict, llm_items: List[Dict]) -> Dict:
+        detected_requirements = list(prepared["boq"].items) + list(llm_items)
+        extraction_stats = prepared["extraction_stats"]
+        extraction_stats["llm_items"] = len(llm_items)
+        if not detected_requirements and not extraction_stats["llm_called"]:
+            # Fallback for testing without keys
+            detected_requirements = [
+                {"name": "Mock AI Item", "specs": {"voltage": "11kV", "insulation": "Mock"}}
+            ]
+
+        result = self._analyze_requirements(detected_requirements, document.text(max_chars=200))
+        result["document_sections"] = prepared["section_index"].to_dict()
+        result["extraction_stats"] = extraction_stats
+        if prepared["ocr_stats"]:
+            result["ocr"] = prepared["ocr_stats"]
+        return result
+
+    def _process_simulated(self, file_content: bytes) -> Dict:
+        full_text = file_content.decode('utf-8')
+        # Simulated extracted text to prompt LLM correctly
+        # We add diverse line items to show "Deep Analysis"
+        full_text += """
             SCOPE OF WORK:
             1. Supply of 11kV XLPE Power Cable, 3 Core, 300sqmm, Armoured. Quantity: 5000 meters.
             2. Supply of 1.1kV PVC Control Cable, 12 Core, 1.5sqmm, Unarmoured. Quantity: 2000 meters.
             3. Enterprise Cloud Hosting & Managed Services for SCADA System. Quantity: 12 months.
             """
-            print("DEBUG: Detected Mock Content, skipping PDF parser.")
-        else:
-            pdf_data = PDFProcessor.extract_structured_data(file_content)
-            full_text = pdf_data["full_text"]
-        
-        print(f"DEBUG: Extracted {len(full_text)} chars from PDF.")
-        if len(full_text.strip()) < 50:
-            return {
-                "summary": "Error: PDF seems empty or is a scanned image. OCR is required but not installed in MVP.",
-                "line_items": [],
-                "raw_text_snippet": "EMPTY_TEXT"
+        print("DEBUG: Detected Mock Content, returning Perfect Extraction.")
+        # FORCE the logic to return these exact items so the Demo is consistent (no LLM call)
+        detected_requirements = [
+            {
+                "name": "11kV XLPE Power Cable, 3 Core, 300sqmm, Armoured",
+                "quantity": 5000.0,
+                "specs": {"voltage": "11kV", "insulation": "XLPE", "cores": "3", "armouring": "Strip"}
+            },
+            {
+                "name": "1.1kV PVC Control Cable, 12 Core, 1.5sqmm, Unarmoured",
+                "quantity": 2000.0,
+                "specs": {"voltage": "1.1kV", "insulation": "PVC", "cores": "12", "armouring": "Unarmoured"}
+            },
+            {
+                "name": "Enterprise Cloud Hosting & Managed Services",
+                "quantity": 12.0,
+                "specs": {"type": "Cloud", "sla": "99.9%", "platform": "AWS/Azure"}
             }
-        
-        # 2. AI Extraction
-        if file_content.startswith(b"Simulated PDF Content"):
-             # BYPASS PDF EXTRACTOR for Magic Run Demo
-             full_text = file_content.decode('utf-8')
-             print("DEBUG: Detected Mock Content, returning Perfect Extraction.")
-             # FORCE the logic to return these exact items so the Demo is consistent
-             detected_requirements = [
-                {
-                    "name": "11kV XLPE Power Cable, 3 Core, 300sqmm, Armoured",
-                    "quantity": 5000.0,
-                    "specs": {"voltage": "11kV", "insulation": "XLPE", "cores": "3", "armouring": "Strip"}
-                },
-                {
-                    "name": "1.1kV PVC Control Cable, 12 Core, 1.5sqmm, Unarmoured",
-                    "quantity": 2000.0,
-                    "specs": {"voltage": "1.1kV", "insulation": "PVC", "cores": "12", "armouring": "Unarmoured"}
-                },
-                {
-                    "name": "Enterprise Cloud Hosting & Managed Services",
-                    "quantity": 12.0,
-                    "specs": {"type": "Cloud", "sla": "99.9%", "platform": "AWS/Azure"}
-                }
-             ]
-             # Skip LLM call
-             self.llm = None 
-        else:
-             # Real PDF Logic
-             if self.llm:
-                 print("DEBUG: Calling AI extraction...")
-                 detected_requirements = self._extract_with_ai(full_text)
-             else:
-                 # Fallback for testing without keys
-                 detected_requirements = [
-                     {"name": "Mock AI Item", "specs": {"voltage": "11kV", "insulation": "Mock"}}
-                 ]
-        
+        ]
+        return self._analyze_requirements(detected_requirements, full_text[:200])
+
+    def _analyze_requirements(self, detected_requirements: List, text_snippet: str) -> Dict:
         # 3. Matching Logic
         matches = []
         total_match_score = 0
-        
-        for req in detected_requirements:
-            # Convert Pydantic model to dict if needed
-            if hasattr(req, "dict"):
-                req_dict = req.dict()
-            else:
-                req_dict = req
 
-            best_match = self._find_best_match(req_dict)
+        # Convert Pydantic models to dicts if needed
+        req_dicts = [req.dict() if hasattr(req, "dict") else req for req in detected_requirements]
+
+        # Batched vector search: one query per group of requirements sharing a pre-filter
+        candidate_lists = [None] * len(req_dicts)
+        if self.vector_db and req_dicts:
+            candidate_lists = self._search_requirements(req_dicts, k=3)
+        
+        for req_dict, candidates in zip(req_dicts, candidate_lists):
+            best_match = self._find_best_match(req_dict, candidates)
             matches.append({
                 "requirement": req_dict,
                 "recommendation": best_match
@@ -154,10 +313,10 @@ class TechnicalAgent:
             "summary": f"AI Analyzed {len(matches)} line items from RFP.",
             "strategic_analysis": strategic_analysis,
             "line_items": matches,
-            "raw_text_snippet": full_text[:200] + "..."
+            "raw_text_snippet": text_snippet + "..."
         }
 
-    def _extract_with_ai(self, text: str) -> List[Dict]:
+    def _extraction_prompt(self):
         parser = PydanticOutputParser(pydantic_object=RFPExtraction)
         
         prompt = PromptTemplate(
@@ -172,37 +331,192 @@ class TechnicalAgent:
             input_variables=["text"],
             partial_variables={"format_instructions": parser.get_format_instructions()}
         )
-        
-        # chain = prompt | self.llm | parser  <-- Old way
-        
-        try:
-            # Chunking text if too large (naive approach for MVP)
-            safe_text = text[:30000] 
-            
-            # Step 1: Get raw response
-            chain_1 = prompt | self.llm
-            response = chain_1.invoke({"text": safe_text})
-            print(f"DEBUG: Raw AI Response: {response.content[:500]}...") # Print first 500 chars
-            
-            # Step 2: Parse
-            output = parser.parse(response.content)
-            return output.items
-        except Exception as e:
-            print(f"AI Extraction Failed: {e}")
+        return prompt, parser
+
+    def _extract_chunks_with_ai(self, chunks: List[str], stats: Optional[Dict] = None) -> List[Dict]:
+        """
+        Map-reduce extraction: every chunk goes to the model concurrently
+        (bounded by LLM_MAX_CONCURRENCY), results are merged and de-duplicated.
+        Latency tracks the slowest chunk rather than the document length.
+        Per-job counters (chunks, cache hits/misses, token usage) are added to `stats`.
+        """
+        if not chunks:
             return []
+        print(f"DEBUG: Extracting requirements from {len(chunks)} chunks...")
+        coro = self._aextract_chunks(chunks, stats if stats is not None else {})
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Called from inside an event loop: run the extraction on its own loop in a worker thread
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, coro).result()
+
+    async def _aextract_chunks(self, chunks: List[str], stats: Dict) -> List[Dict]:
+        prompt, parser = self._extraction_prompt()
+        # chain = prompt | self.llm | parser  <-- Old way
+        chain_1 = prompt | self._llm_for_running_loop()
+        semaphore = asyncio.Semaphore(max(1, settings.LLM_MAX_CONCURRENCY))
+        template_id = prompt.template + parser.get_format_instructions()
+        overhead_tokens = count_tokens(template_id)
+        stats["llm_chunks"] = stats.get("llm_chunks", 0) + len(chunks)
+        stats.setdefault("llm_cache_hits", 0)
+        stats.setdefault("llm_cache_misses", 0)
+        stats.setdefault("llm_chunks_failed", 0)
+
+        # Cached chunks are free; only the rest has to fit in the per-job token budget
+        cache_keys = [LLMResponseCache.make_key(self.MODEL_NAME, template_id, chunk) for chunk in chunks]
+        cached = [self.llm_cache.get(key) if self.llm_cache else None for key in cache_keys]
+        uncached = [idx for idx, content in enumerate(cached) if content is None]
+        budget = TokenBudget()
+        planned = budget.plan(
+            [chunks[idx] for idx in uncached],
+            [relevance_score(chunks[idx]) for idx in uncached],
+            overhead_tokens
+        )
+        to_send = dict(zip(uncached, planned))
+        if budget.chunks_skipped or budget.chunks_trimmed:
+            print(f"WARNING: Token budget {budget.max_tokens}: trimmed {budget.chunks_trimmed}, skipped {budget.chunks_skipped} low-relevance chunks.")
+
+        async def extract_chunk(idx: int, chunk: str) -> List[Dict]:
+            content = cached[idx]
+            if content is None and to_send[idx] is None:
+                return []
+            stats_key = "llm_cache_hits" if content is not None else "llm_cache_misses"
+            stats[stats_key] += 1
+            async with semaphore:
+                try:
+                    # Step 1: Get raw response (from the cache when this chunk was seen before)
+                    if content is None:
+                        chunk = to_send[idx]
+                        response = await asyncio.wait_for(
+                            chain_1.ainvoke({"text": chunk}),
+                            timeout=settings.LLM_CHUNK_TIMEOUT_SECONDS
+                        )
+                        content = response.content
+                        print(f"DEBUG: Raw AI Response (chunk {idx + 1}/{len(chunks)}): {content[:500]}...")
+                        usage = getattr(response, "usage_metadata", None) or {}
+                        budget.record(
+                            usage.get("input_tokens") or overhead_tokens + count_tokens(chunk),
+                            usage.get("output_tokens") or count_tokens(content)
+                        )
+                    else:
+                        budget.record(overhead_tokens + count_tokens(chunk), count_tokens(content), cached=True)
+                    # Step 2: Parse
+                    items = [item.dict() for item in parser.parse(content).items]
+                    # Only cache responses that parsed, so a bad answer is retried next time.
+                    # Answers for budget-trimmed chunks don't cover the full chunk and aren't cached.
+                    if self.llm_cache and stats_key == "llm_cache_misses" and chunk == chunks[idx]:
+                        self.llm_cache.put(cache_keys[idx], content)
+                    return items
+                except asyncio.TimeoutError:
+                    print(f"WARNING: AI Extraction timed out for chunk {idx + 1}/{len(chunks)}")
+                    stats["llm_chunks_failed"] += 1
+                    return []
+                except Exception as e:
+                    # Counted separately so a failed chunk isn't mistaken for one with no items
+                    print(f"WARNING: AI Extraction Failed for chunk {idx + 1}/{len(chunks)}: {type(e).__name__}: {e}")
+                    stats["llm_chunks_failed"] += 1
+                    return []
+
+        results = await asyncio.gather(*(extract_chunk(i, c) for i, c in enumerate(chunks)))
+        stats["token_usage"] = budget.to_dict()
+        print(f"DEBUG: Token usage: {stats['token_usage']}")
+        return self._merge_extracted_items(results)
 
-    def _find_best_match(self, req: Dict) -> Dict:
+    @staticmethod
+    def _merge_extracted_items(results: List[List[Dict]]) -> List[Dict]:
+        """
+        Reduce step. Adjacent chunks share an overlap, so a line item near a
+        boundary is reported by both. An item is dropped only when the previous
+        chunk reported the same name + specs with a compatible quantity; repeated
+        lines within a chunk or far apart (e.g. the same cable in two lots) are kept.
+        """
+        def item_key(item: Dict) -> tuple:
+            specs = item.get("specs") or {}
+            return (
+                " ".join(str(item.get("name", "")).lower().split()),
+                tuple(sorted((k, str(v).strip().lower()) for k, v in specs.items()))
+            )
+
+        merged: List[Dict] = []
+        previous: Dict[tuple, List[Dict]] = {}
+        for items in results:
+            current: Dict[tuple, List[Dict]] = {}
+            for item in items:
+                key = item_key(item)
+                quantity = item.get("quantity")
+                twin = next((seen for seen in previous.get(key, [])
+                             if not quantity or not seen.get("quantity") or seen["quantity"] == quantity), None)
+                if twin is not None:
+                    # Each item of the previous chunk absorbs at most one overlap duplicate
+                    previous[key].remove(twin)
+                    if quantity and not twin.get("quantity"):
+                        twin["quantity"] = quantity
+                    continue
+                merged.append(item)
+                current.setdefault(key, []).append(item)
+            previous = current
+        return merged
+
+    @staticmethod
+    def _requirement_where(req: Dict) -> Optional[Dict]:
+        req_specs = req.get("specs", {})
+        if hasattr(req_specs, "dict"):
+            req_specs = req_specs.dict()
+        return requirement_filter(normalize_specs(req_specs, req.get("name", "")), req.get("category"))
+
+    def _search_requirements(self, req_dicts: List[Dict], k: int = 3) -> List[List[Dict]]:
+        """
+        Searches every requirement, narrowed by a metadata filter derived from its
+        specs. Requirements with the same filter share one search_many call;
+        any that find nothing under their filter are retried unfiltered together.
+        """
+        queries = [self._query_text(r) for r in req_dicts]
+        if not settings.VECTOR_PREFILTER:
+            return self.vector_db.search_many(queries, k=k)
+
+        groups: Dict[str, List[int]] = {}
+        wheres: Dict[str, Optional[Dict]] = {}
+        for idx, req in enumerate(req_dicts):
+            where = self._requirement_where(req)
+            key = json.dumps(where, sort_keys=True)
+            groups.setdefault(key, []).append(idx)
+            wheres[key] = where
+
+        results: List[List[Dict]] = [[] for _ in req_dicts]
+        for key, idxs in groups.items():
+            try:
+                found = self.vector_db.search_many([queries[i] for i in idxs], k=k, where=wheres[key])
+            except Exception as e:
+                print(f"WARNING: Filtered search failed ({e}), falling back to unfiltered.")
+                continue
+            for i, matches in zip(idxs, found):
+                results[i] = matches
+
+        empty = [i for i, matches in enumerate(results) if not matches]
+        if empty:
+            print(f"DEBUG: {len(empty)} requirement(s) had no pre-filtered match, searching whole catalog.")
+            for i, matches in zip(empty, self.vector_db.search_many([queries[i] for i in empty], k=k)):
+                results[i] = matches
+        return results
+
+    @staticmethod
+    def _query_text(req: Dict) -> str:
+        return f"{req.get('name')} {req.get('specs', '')}"
+
+    def _find_best_match(self, req: Dict, candidates: Optional[List[Dict]] = None) -> Dict:
         """
         Uses Semantic Search via ChromaDB to find top 3 products 
         and generates a comparison table.
+        `candidates` can be passed in from a batched search_many call.
         """
         if not self.vector_db:
              return {"sku": "DB_ERROR", "name": "Vector DB not loaded", "match_score": 0}
              
-        query_text = f"{req.get('name')} {req.get('specs', '')}"
-        
         # Get Top 3 Results
-        candidates = self.vector_db.search(query_text, k=3)
+        if candidates is None:
+            candidates = self.vector_db.search(self._query_text(req), k=3)
         
         if not candidates:
             return {"sku": "NO_MATCH", "name": "No suitable product found", "match_score": 0}
@@ -212,49 +526,37 @@ class TechnicalAgent:
         
         comparison_list = []
 
+        # ------------------------------------------------------------------
+        # CONSULTING LOGIC: Granular Spec Breakdown
+        # ------------------------------------------------------------------
+        # The requirement is normalized once and compared against every candidate's
+        # row in the columnar spec index (parsed at ingest, no per-search json.loads)
+        req_specs = req.get("specs", {})
+        if hasattr(req_specs, "dict"):
+             req_specs = req_specs.dict()
+        spec_index = self.vector_db.spec_index
+        rows = spec_index.rows([cand.get("sku") for cand in candidates])
+        comparison = spec_index.compare(normalize_specs(req_specs, req.get("name", "")), rows)
+
         # Evaluate matches
         for idx, cand in enumerate(candidates):
             # Calculate a mock "Spec Match %" based on distance
             dist = cand.get('distance', 1.0)
             base_score = max(0, min(100, int((1.5 - dist) / 1.5 * 100)))
+            # A spec that contradicts the requirement outweighs a close embedding
+            mismatches = sum(int(comparison[field][idx] == MISMATCH) for field, _ in SPEC_LABELS)
+            base_score = max(0, base_score - SPEC_MISMATCH_PENALTY * mismatches)
 
-            # ------------------------------------------------------------------
-            # CONSULTING LOGIC: Granular Spec Breakdown
-            # ------------------------------------------------------------------
-            # We compare the 'specs' from the Requirement vs 'specs' from the Candidate Metadata
-            # We compare the 'specs' from the Requirement vs 'specs' from the Candidate Metadata
-            cand_specs = cand.get("specs", {})
-            
-            # Helper to parse stringified JSON from Chroma
-            if isinstance(cand_specs, str):
-                try:
-                    cand_specs = json.loads(cand_specs)
-                except:
-                    cand_specs = {}
-            
-            req_specs = req.get("specs", {})
-            if hasattr(req_specs, "dict"):
-                 req_specs = req_specs.dict()
-            
             detailed_analysis = []
-            
-            # 1. Voltage Check
-            if "voltage" in req_specs and "voltage" in cand_specs:
-                r_v = str(req_specs["voltage"]).lower()
-                c_v = str(cand_specs["voltage"]).lower()
-                if "not" in r_v or r_v in c_v or c_v in r_v:
-                     detailed_analysis.append({"spec": "Voltage", "status": "Methods", "value": cand_specs["voltage"]})
-                else:
-                     detailed_analysis.append({"spec": "Voltage", "status": "Mismatch", "value": cand_specs["voltage"]})
-            
-            # 2. Insulation Check
-            if "insulation" in req_specs and "insulation" in cand_specs:
-                r_i = str(req_specs["insulation"]).lower()
-                c_i = str(cand_specs["insulation"]).lower()
-                if "not" in r_i or r_i in c_i or c_i in r_i:
-                     detailed_analysis.append({"spec": "Insulation", "status": "Match", "value": cand_specs["insulation"]})
-                else:
-                     detailed_analysis.append({"spec": "Insulation", "status": "Mismatch", "value": cand_specs["insulation"]})
+            for field, label in SPEC_LABELS:
+                status = comparison[field][idx]
+                if status == NOT_COMPARABLE:
+                    continue
+                detailed_analysis.append({
+                    "spec": label,
+                    "status": "Match" if status == MATCH else "Mismatch",
+                    "value": spec_index.display_value(field, rows[idx])
+                })
 
             # For Services, we just add a generic check
             if cand.get("category") == "Service":
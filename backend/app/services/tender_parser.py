@@ -0,0 +1,168 @@
+import io
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+from app.core.config import settings
+
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    etree = None
+    HAS_LXML = False
+
+ROW_CLASS = "tender-row"
+DATE_FORMAT = "%Y-%m-%d"
+
+# (id, title, publish date, due date, link) as raw strings from one listing row
+RawRow = Tuple[str, str, str, str, str]
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> Optional[datetime]:
+    """
+    Listings repeat the same few dates across thousands of rows, so each
+    distinct string is parsed once. None for anything that isn't a date.
+    """
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+def _iter_rows_strainer(html: str) -> Iterator[RawRow]:
+    """
+    BeautifulSoup restricted by a SoupStrainer to tender rows, so the rest of
+    the page never becomes a tree. Works with only bs4 installed.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("tr", class_=ROW_CLASS))
+    for row in soup.find_all("tr", class_=ROW_CLASS):
+        cols = row.find_all("td")
+        if len(cols) < 5:
+            continue
+        anchor = cols[4].find("a")
+        link = anchor.get("href", "") if anchor else ""
+        yield (cols[0].get_text().strip(), cols[1].get_text().strip(), cols[2].get_text().strip(),
+               cols[3].get_text().strip(), link)
+
+
+class _EncodedReader:
+    """
+    Read-only file object over a str that hands out UTF-8 bytes a slice at a
+    time, so iterparse can read a large page without a second full copy of it.
+    """
+    def __init__(self, text: str, chunk_chars: int = 64 * 1024):
+        self.text = text
+        self.chunk_chars = chunk_chars
+        self.pos = 0
+        self.buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while (size < 0 or len(self.buffer) < size) and self.pos < len(self.text):
+            self.buffer += self.text[self.pos:self.pos + self.chunk_chars].encode("utf-8")
+            self.pos += self.chunk_chars
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def _iter_rows_lxml(html) -> Iterator[RawRow]:
+    """
+    lxml iterparse over the page: each row is handed out as soon as its closing
+    tag is read and then freed, so memory stays flat however long the page is.
+    A str page is fed as UTF-8 with the encoding stated, so libxml2 never guesses
+    the charset of pages without a <meta charset>; bytes are left to its detection.
+    """
+    if isinstance(html, str):
+        source, encoding = _EncodedReader(html), "utf-8"
+    else:
+        source, encoding = io.BytesIO(html), None
+    for _, row in etree.iterparse(source, events=("end",), tag="tr", html=True, recover=True, encoding=encoding):
+        if ROW_CLASS in (row.get("class") or "").split():
+            cols = row.findall("td")
+            if len(cols) >= 5:
+                anchor = cols[4].find(".//a")
+                link = anchor.get("href", "") if anchor is not None else ""
+                yield ("".join(cols[0].itertext()).strip(), "".join(cols[1].itertext()).strip(),
+                       "".join(cols[2].itertext()).strip(), "".join(cols[3].itertext()).strip(), link)
+        # Free the row and everything before it
+        row.clear()
+        parent = row.getparent()
+        if parent is not None:
+            while row.getprevious() is not None:
+                del parent[0]
+
+
+BACKENDS = {
+    "strainer": _iter_rows_strainer,
+    "lxml": _iter_rows_lxml,
+}
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    backend = backend or settings.TENDER_PARSER_BACKEND
+    if backend == "auto":
+        return "lxml" if HAS_LXML else "strainer"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown tender parser backend: {backend} (expected auto, {', '.join(BACKENDS)})")
+    if backend == "lxml" and not HAS_LXML:
+        print("WARNING: lxml not installed, falling back to the SoupStrainer tender parser.")
+        return "strainer"
+    return backend
+
+
+def iter_raw_rows(html, backend: Optional[str] = None) -> Iterator[RawRow]:
+    return BACKENDS[resolve_backend(backend)](html)
+
+
+def build_opportunity(row: RawRow, source: str, today: datetime) -> Optional[Tuple[Dict, datetime]]:
+    """
+    Opportunity dict for one listing row plus its parsed due date, or None if
+    the due date is unreadable.
+    """
+    t_id, title, pub_date_str, due_date_str, link = row
+    due_dt = parse_date(due_date_str)
+    if due_dt is None:
+        return None
+
+    # Calculate Risk/Fit (Consulting Logic on top of Scraping)
+    days_left = (due_dt - today).days
+    risk = "Low"
+    action = "REVIEW"
+    if days_left < 7:
+        risk = "HIGH (Urgent)"
+        action = "EXPEDITE"
+
+    # In real app, we'd scan the Title keywords against our capabilities
+    fit_score = 90 if "XLPE" in title else (75 if "Control" in title else 40)
+
+    opp = {
+        "id": t_id,
+        "title": title,
+        "source": source,
+        "publish_date": pub_date_str,
+        "due_date": due_date_str,
+        "status": "OPEN",
+        "match_score": fit_score,
+        "url": link,
+        "submission_risk": f"{risk} ({days_left} days left)",
+        "strategic_fit": "High" if fit_score > 80 else "Low",
+        "right_to_win_score": fit_score - 5, # Mock calc
+        "action": action
+    }
+    return opp, due_dt
+
+
+def iter_opportunities(html, source: str, backend: Optional[str] = None,
+                       today: Optional[datetime] = None) -> Iterator[Tuple[Dict, datetime]]:
+    """
+    Yields (opportunity, due date) pairs one row at a time as the page is parsed.
+    """
+    today = today or datetime.now()
+    for row in iter_raw_rows(html, backend):
+        built = build_opportunity(row, source, today)
+        if built is not None:
+            yield built
@@ -0,0 +1,108 @@
+from typing import List, Dict, Optional
+from app.core.config import settings
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """
+    tiktoken's cl100k_base, loaded once. Llama's tokenizer differs slightly but
+    counts are close enough for budgeting. None when tiktoken can't be loaded
+    (e.g. the BPE file can't be downloaded), in which case counts are estimated.
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(settings.LLM_TOKENIZER_ENCODING)
+        except Exception as e:
+            print(f"WARNING: tiktoken unavailable, estimating tokens from length: {e}")
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+class TokenBudget:
+    """
+    Per-job token accounting for the LLM stages. Counts prompt and completion
+    tokens per call and keeps a job inside LLM_TOKEN_BUDGET_PER_JOB by sending
+    the most relevant chunks first, trimming the last one that partly fits and
+    skipping the rest.
+    """
+    def __init__(self, max_tokens: Optional[int] = None, completion_reserve: Optional[int] = None):
+        self.max_tokens = settings.LLM_TOKEN_BUDGET_PER_JOB if max_tokens is None else max_tokens
+        self.completion_reserve = settings.LLM_COMPLETION_TOKENS_RESERVE if completion_reserve is None else completion_reserve
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.calls: List[Dict] = []
+        self.chunks_planned = 0
+        self.chunks_trimmed = 0
+        self.chunks_skipped = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def plan(self, chunks: List[str], relevance: List[float], overhead_tokens: int) -> List[Optional[str]]:
+        """
+        Fits chunks into the budget, most relevant first. Returns a list aligned
+        with `chunks`: the chunk (possibly trimmed) if it will be sent, None if skipped.
+        `overhead_tokens` is the prompt template cost paid by every call.
+        """
+        planned: List[Optional[str]] = [None] * len(chunks)
+        self.chunks_planned += len(chunks)
+        if not self.max_tokens:
+            return list(chunks)
+
+        remaining = self.max_tokens - self.total_tokens
+        for idx in sorted(range(len(chunks)), key=lambda i: relevance[i], reverse=True):
+            per_call = overhead_tokens + self.completion_reserve
+            chunk_tokens = count_tokens(chunks[idx])
+            if per_call + chunk_tokens <= remaining:
+                planned[idx] = chunks[idx]
+                remaining -= per_call + chunk_tokens
+            elif remaining - per_call >= settings.LLM_MIN_CHUNK_TOKENS:
+                planned[idx] = truncate_to_tokens(chunks[idx], remaining - per_call)
+                remaining = 0
+                self.chunks_trimmed += 1
+            else:
+                self.chunks_skipped += 1
+        return planned
+
+    def record(self, prompt_tokens: int, completion_tokens: int, cached: bool = False):
+        if cached:
+            # Served from the response cache: nothing was sent to the model
+            self.cached_tokens += prompt_tokens + completion_tokens
+        else:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        self.calls.append({"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cached": cached})
+
+    def to_dict(self) -> Dict:
+        return {
+            "budget": self.max_tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cached_tokens": self.cached_tokens,
+            "llm_calls": sum(1 for c in self.calls if not c["cached"]),
+            "chunks_planned": self.chunks_planned,
+            "chunks_trimmed": self.chunks_trimmed,
+            "chunks_skipped": self.chunks_skipped
+        }
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import threading
+import uuid
+import aiofiles
+from fastapi import UploadFile
+from app.core.config import settings
+
+
+class UploadSpool:
+    """
+    Content-addressed spool directory for uploaded RFPs.
+    Uploads are streamed to disk chunk by chunk and stored as <sha256>.pdf,
+    so identical re-uploads share one file and nothing is kept in RAM.
+    Every save() takes a reference on the file and every release() drops one;
+    the file is deleted when the last job using it has finished.
+    """
+    def __init__(self, root: str = None, chunk_size: int = None):
+        self.root = root or settings.UPLOAD_SPOOL_DIR
+        self.chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._refs = {}
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, f"{digest}.pdf")
+
+    async def save(self, file: UploadFile) -> str:
+        """
+        Streams the upload to a temp file while hashing it, then moves it into place.
+        Returns the path of the spooled PDF; pass it to release() when the job is done.
+        """
+        sha = hashlib.sha256()
+        tmp_path = os.path.join(self.root, f".{uuid.uuid4().hex}.part")
+
+        try:
+            async with aiofiles.open(tmp_path, "wb") as out:
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    sha.update(chunk)
+                    await out.write(chunk)
+
+            final_path = self.path_for(sha.hexdigest())
+            # Under the lock, so a concurrent release() can't delete the file we are about to share
+            with self._lock:
+                if os.path.exists(final_path):
+                    # Same content already spooled
+                    os.remove(tmp_path)
+                else:
+                    os.replace(tmp_path, final_path)
+                self._refs[final_path] = self._refs.get(final_path, 0) + 1
+            return final_path
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def release(self, path: str):
+        """
+        Drops one job's reference on a spooled file and deletes it once unused.
+        """
+        with self._lock:
+            remaining = self._refs.get(path, 0) - 1
+            if remaining > 0:
+                self._refs[path] = remaining
+                return
+            self._refs.pop(path, None)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
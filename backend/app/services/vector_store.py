@@ -1,62 +1,263 @@
 import chromadb
 from chromadb.utils import embedding_functions
 from app.core.config import settings
+from app.services.spec_index import SpecIndex, normalize_specs, spec_metadata, flat_spec_metadata
+from app.services.numpy_index import NumpyVectorIndex
+from app.services.ivf_index import IVFQuantizedIndex, recall_latency_report
+import hashlib
 import os
 
 class ProductVectorDB:
-    def __init__(self):
+    def __init__(self, backend: str = None, path: str = "./chroma_db", collection_name: str = "product_catalog",
+                 embedding_function=None):
+        # "chroma" queries the collection directly; "numpy" answers from an in-process exact index;
+        # "ivf" from an approximate, int8/float16-quantized in-process index
+        self.backend = backend or settings.VECTOR_BACKEND
         # Use persistent storage
-        self.client = chromadb.PersistentClient(path="./chroma_db")
+        self.path = os.path.abspath(path)
+        self.client = chromadb.PersistentClient(path=path)
         
         # Use Google's embedding model if available, otherwise default
-        if settings.GOOGLE_API_KEY:
+        if embedding_function is not None:
+            self.ef = embedding_function
+        elif settings.GOOGLE_API_KEY:
             self.ef = embedding_functions.GoogleGenerativeAiEmbeddingFunction(api_key=settings.GOOGLE_API_KEY)
         else:
             # Fallback to default (all-MiniLM-L6-v2)
             self.ef = embedding_functions.DefaultEmbeddingFunction()
             
         self.collection = self.client.get_or_create_collection(
-            name="product_catalog",
+            name=collection_name,
             embedding_function=self.ef
         )
+        self._spec_index = None
+        self._numpy_index = None
+        self._ivf_index = None
 
-    def add_products(self, products: list[dict]):
+    def invalidate_indexes(self):
+        """
+        Drops in-process indexes after the catalog changes; they rebuild on next use.
+        """
+        self._spec_index = None
+        self._numpy_index = None
+        self._ivf_index = None
+
+    def add_products(self, products: list[dict], embeddings: list = None):
         """
         Products should be a list of dicts with keys: id, name, details, price, etc.
+        Pass `embeddings` (one per product, from embed()) to skip embedding inside the upsert.
         """
+        ids, documents, metadatas = self.prepare_records(products)
+        
+        self.collection.upsert(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            embeddings=embeddings
+        )
+        self.invalidate_indexes()
+
+    @staticmethod
+    def prepare_records(products: list[dict]) -> tuple[list[str], list[str], list[dict]]:
+        """
+        Ids, embedded documents and primitive-only metadatas for a batch of products.
+        A SKU listed more than once keeps its last row; Chroma rejects duplicate ids in one write.
+        """
+        products = list({str(p["sku"]): p for p in products}.values())
         ids = [str(p["sku"]) for p in products]
         documents = [f"{p['name']} - {p.get('details', '')}" for p in products]
         metadatas = []
         import json
         for p in products:
             meta = p.copy()
+            # Parse specs once at ingest into typed, normalized spec_* fields
+            specs = meta.get("specs") if isinstance(meta.get("specs"), dict) else {}
+            meta.update(spec_metadata(normalize_specs(specs, meta.get("name", ""))))
+            # Every other primitive spec is flattened too, so all specs are filterable
+            for key, value in flat_spec_metadata(specs).items():
+                meta.setdefault(key, value)
             # Flatten or stringify 'specs' because Chroma metadata must be primitives
             if "specs" in meta and isinstance(meta["specs"], dict):
                 meta["specs"] = json.dumps(meta["specs"])
             metadatas.append(meta)
-        
-        self.collection.upsert(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
+        for meta, document in zip(metadatas, documents):
+            # Content hash of the embedded text; unchanged text never needs re-embedding
+            meta["doc_hash"] = hashlib.sha256(document.encode("utf-8")).hexdigest()
+        return ids, documents, metadatas
+
+    def embed(self, documents: list[str]) -> list:
+        return self.ef(list(documents))
+
+    def diff_records(self, ids: list[str], metadatas: list[dict]) -> tuple[list[int], list[int], int, dict]:
+        """
+        Compares prepared records against the stored doc_hash of each SKU.
+        Returns (positions to embed, positions with unchanged text, number of new SKUs,
+        {position: stored keys the new record no longer has}, e.g. a removed spec).
+        Chroma merges metadata on write, so write_records deletes those keys separately.
+        """
+        stored = {}
+        if ids:
+            found = self.collection.get(ids=list(ids), include=["metadatas"])
+            stored = {i: m or {} for i, m in zip(found["ids"], found["metadatas"])}
+        changed, unchanged, removed = [], [], {}
+        for pos, (sku, meta) in enumerate(zip(ids, metadatas)):
+            dropped = [key for key in stored.get(sku, {}) if key not in meta]
+            if dropped:
+                removed[pos] = dropped
+            if sku in stored and stored[sku].get("doc_hash") == meta["doc_hash"]:
+                unchanged.append(pos)
+            else:
+                changed.append(pos)
+        added = sum(1 for sku in ids if sku not in stored)
+        return changed, unchanged, added, removed
+
+    def write_records(self, ids: list[str], documents: list[str], metadatas: list[dict],
+                      changed: list[int], unchanged: list[int], embeddings: list = None,
+                      removed: dict = None):
+        """
+        Upserts the changed positions (with `embeddings` for them, if precomputed)
+        and applies a metadata-only update to the unchanged ones. `removed` is the
+        {position: keys} map from diff_records; those keys are deleted afterwards.
+        """
+        if changed:
+            self.collection.upsert(
+                ids=[ids[i] for i in changed],
+                documents=[documents[i] for i in changed],
+                metadatas=[metadatas[i] for i in changed],
+                embeddings=embeddings
+            )
+        if unchanged:
+            # update() without documents/embeddings leaves the stored vectors untouched
+            self.collection.update(
+                ids=[ids[i] for i in unchanged],
+                metadatas=[metadatas[i] for i in unchanged]
+            )
+        if removed:
+            # A None value deletes the key (chromadb>=1.0); kept out of the upsert, which only carries real values
+            self.collection.update(
+                ids=[ids[i] for i in removed],
+                metadatas=[{key: None for key in keys} for keys in removed.values()]
+            )
+        self.invalidate_indexes()
+
+    def all_ids(self) -> list[str]:
+        return self.collection.get(include=[])["ids"]
+
+    def delete_products(self, skus: list[str]) -> int:
+        skus = list(skus)
+        batch_size = settings.CATALOG_INGEST_BATCH_SIZE
+        for start in range(0, len(skus), batch_size):
+            self.collection.delete(ids=skus[start:start + batch_size])
+        if skus:
+            self.invalidate_indexes()
+        return len(skus)
+
+    def sync_products(self, products: list[dict], prune: bool = False) -> dict:
+        """
+        Incremental catalog sync. Only SKUs whose embedded text changed (or that are
+        new) are re-embedded; the rest keep their vectors and get new metadata (e.g. a
+        new price). With `prune`, `products` is treated as the full catalog and SKUs
+        missing from it are deleted, so only pass it for a complete catalog.
+        """
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        seen = set()
+        batch_size = settings.CATALOG_INGEST_BATCH_SIZE
+        for start in range(0, len(products), batch_size):
+            ids, documents, metadatas = self.prepare_records(products[start:start + batch_size])
+            seen.update(ids)
+            changed, unchanged, added, removed = self.diff_records(ids, metadatas)
+            embeddings = self.embed([documents[i] for i in changed]) if changed else None
+            self.write_records(ids, documents, metadatas, changed, unchanged, embeddings, removed)
+            stats["added"] += added
+            stats["updated"] += len(changed) - added
+            stats["unchanged"] += len(unchanged)
+
+        if prune:
+            stats["deleted"] = self.delete_products([sku for sku in self.all_ids() if sku not in seen])
+        return stats
+
+    @property
+    def spec_index(self) -> SpecIndex:
+        """
+        Columnar spec index over the whole catalog, built on first use and after each ingest.
+        """
+        if self._spec_index is None:
+            self._spec_index = SpecIndex.from_collection(self.collection)
+        return self._spec_index
+
+    @property
+    def numpy_index(self) -> NumpyVectorIndex:
+        """
+        In-process exact index loaded from the collection, built on first use and after each ingest.
+        """
+        if self._numpy_index is None:
+            self._numpy_index = NumpyVectorIndex.from_collection(self.collection)
+            print(f"DEBUG: NumPy index loaded with {len(self._numpy_index)} products.")
+        return self._numpy_index
+
+    @property
+    def ivf_index(self) -> IVFQuantizedIndex:
+        """
+        Approximate quantized index loaded from the collection, built on first use and after each ingest.
+        """
+        if self._ivf_index is None:
+            self._ivf_index = IVFQuantizedIndex.from_collection(
+                self.collection,
+                n_lists=settings.IVF_N_LISTS,
+                nprobe=settings.IVF_NPROBE,
+                code_dtype=settings.IVF_CODE_DTYPE,
+                train_size=settings.IVF_TRAIN_SIZE
+            )
+            print(f"DEBUG: IVF index loaded with {len(self._ivf_index)} products in "
+                  f"{len(self._ivf_index.centroids)} lists ({self._ivf_index.memory_bytes / 1e6:.1f} MB).")
+        return self._ivf_index
+
+    def ivf_report(self, queries: list[str], k: int = 10, nprobes: list[int] = None) -> dict:
+        """
+        Recall@k and latency of the IVF index per nprobe, against exact search, for
+        choosing IVF_NPROBE. Loads the exact index too, so run it offline.
+        """
+        embeddings = self.ef(list(queries))
+        return recall_latency_report(self.ivf_index, self.numpy_index, embeddings, k=k, nprobes=nprobes)
+
+    def search(self, query: str, k: int = 3, where: dict = None) -> list[dict]:
+        return self.search_many([query], k=k, where=where)[0]
+
+    def search_many(self, queries: list[str], k: int = 3, where: dict = None) -> list[list[dict]]:
+        """
+        Batched search: all queries are embedded in one pass and sent to Chroma
+        as a single query. Returns one list of matches per query, in order.
+        `where` is a Chroma metadata filter applied to every query in the batch
+        (e.g. from spec_index.requirement_filter), so only matching products are ranked.
+        """
+        if not queries:
+            return []
+
+        embeddings = self.ef(list(queries))
+        if self.backend == "numpy":
+            rows = self.numpy_index.rows_matching(where) if where else None
+            return self.numpy_index.search_many(embeddings, k=k, rows=rows)
+        if self.backend == "ivf":
+            rows = self.ivf_index.rows_matching(where) if where else None
+            return self.ivf_index.search_many(embeddings, k=k, rows=rows)
 
-    def search(self, query: str, k: int = 3) -> list[dict]:
         results = self.collection.query(
-            query_texts=[query],
-            n_results=k
+            query_embeddings=embeddings,
+            n_results=k,
+            where=where
         )
-        
-        if not results['documents'][0]:
-            return []
-            
-        matches = []
+
+        all_matches = []
         # Chromadb results are lists of lists (one list per query)
-        for i in range(len(results['metadatas'][0])):
-            item = results['metadatas'][0][i]
-            # Chroma returns distance (smaller is better). 
-            # We can convert to a similarity score if needed, but for now we keep distance.
-            item['distance'] = results['distances'][0][i] 
-            matches.append(item)
+        for q in range(len(queries)):
+            matches = []
+            if results['documents'][q]:
+                for i in range(len(results['metadatas'][q])):
+                    item = results['metadatas'][q][i]
+                    # Chroma returns distance (smaller is better). 
+                    # We can convert to a similarity score if needed, but for now we keep distance.
+                    item['distance'] = results['distances'][q][i] 
+                    matches.append(item)
+            all_matches.append(matches)
             
-        return matches
+        return all_matches
@@ -0,0 +1,182 @@
+"""
+Retrieval benchmark: builds synthetic catalogs of increasing size, then measures
+ProductVectorDB.search / search_many and TechnicalAgent._find_best_match
+latency, throughput, memory and recall@k against labelled queries.
+
+Runs offline with the default (all-MiniLM-L6-v2) embedding function. Run from backend/:
+
+    python -m benchmarks.retrieval_bench --sizes 1000 10000 --backends chroma numpy ivf
+
+Results are written as JSON to benchmarks/results/ for comparison between runs.
+Embedding dominates build time; a 1M catalog takes hours on CPU, so reuse a
+built catalog with --keep and the same --work-dir. Each backend is measured in
+its own process, so max_rss_mb is that backend's peak alone.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import time
+from datetime import datetime
+from typing import Dict, List
+import numpy as np
+from chromadb.utils import embedding_functions
+from benchmarks.synthetic_catalog import write_catalog, generate_queries
+from app.services.catalog_ingest import CatalogIngestor
+from app.services.vector_store import ProductVectorDB
+from app.services.technical_agent import TechnicalAgent
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _percentiles(samples_ms: List[float]) -> Dict:
+    arr = np.asarray(samples_ms)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "mean_ms": round(float(arr.mean()), 3),
+    }
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if platform.system() == "Darwin" else rss / 1024, 1)
+
+
+def _recall(results: List[List[Dict]], queries: List[Dict], k: int) -> Dict:
+    """
+    recall@k: share of the best achievable hits (min(k, #relevant)) found in the top k.
+    hit_rate@k: share of queries with at least one relevant SKU in the top k.
+    """
+    recall, hits = 0.0, 0
+    for matches, query in zip(results, queries):
+        relevant = set(query["relevant_skus"])
+        found = sum(1 for m in matches[:k] if m.get("sku") in relevant)
+        recall += found / min(k, len(relevant))
+        hits += found > 0
+    n = max(len(queries), 1)
+    return {f"recall_at_{k}": round(recall / n, 4), f"hit_rate_at_{k}": round(hits / n, 4)}
+
+
+def open_catalog(db_path: str) -> ProductVectorDB:
+    return ProductVectorDB(path=db_path, collection_name="bench_catalog",
+                           embedding_function=embedding_functions.DefaultEmbeddingFunction())
+
+
+def build_catalog(size: int, work_dir: str, seed: int, keep: bool) -> tuple:
+    catalog_path = os.path.join(work_dir, f"catalog_{size}.jsonl")
+    db_path = os.path.join(work_dir, f"chroma_{size}")
+    labels = write_catalog(catalog_path, size, seed)
+    db = open_catalog(db_path)
+    build = {"reused": False}
+    if keep and db.collection.count() == size:
+        build["reused"] = True
+    else:
+        t0 = time.perf_counter()
+        stats = CatalogIngestor(db).run(catalog_path, prune=True)
+        build["ingest_seconds"] = round(time.perf_counter() - t0, 2)
+        build["products_per_second"] = stats["products_per_second"]
+    return db_path, labels, build
+
+
+def bench_backend(db: ProductVectorDB, backend: str, queries: List[Dict], ks: List[int]) -> Dict:
+    db.backend = backend
+    texts = [TechnicalAgent._query_text(q) for q in queries]
+    k_max = max(ks)
+    report = {"backend": backend}
+
+    # Warm-up also builds any in-process index, timed separately
+    t0 = time.perf_counter()
+    db.search(texts[0], k=k_max)
+    db.spec_index
+    report["warmup_seconds"] = round(time.perf_counter() - t0, 3)
+    if backend == "numpy":
+        report["index_memory_mb"] = round(db.numpy_index.memory_bytes / 1e6, 1)
+    elif backend == "ivf":
+        report["index_memory_mb"] = round(db.ivf_index.memory_bytes / 1e6, 1)
+
+    # Single-query latency, including embedding the query
+    latencies, results = [], []
+    for text in texts:
+        t = time.perf_counter()
+        results.append(db.search(text, k=k_max))
+        latencies.append((time.perf_counter() - t) * 1000)
+    report["search"] = _percentiles(latencies)
+    for k in ks:
+        report.update(_recall(results, queries, k))
+
+    # Batched throughput
+    t = time.perf_counter()
+    db.search_many(texts, k=k_max)
+    elapsed = time.perf_counter() - t
+    report["search_many_qps"] = round(len(texts) / elapsed, 1)
+
+    # End-to-end matching: search plus spec comparison per requirement
+    agent = TechnicalAgent(vector_db=db)
+    latencies, top1 = [], 0
+    for query in queries:
+        requirement = {key: value for key, value in query.items() if key != "relevant_skus"}
+        t = time.perf_counter()
+        match = agent._find_best_match(requirement)
+        latencies.append((time.perf_counter() - t) * 1000)
+        top1 += match.get("sku") in set(query["relevant_skus"])
+    report["find_best_match"] = _percentiles(latencies)
+    report["find_best_match"]["accuracy"] = round(top1 / max(len(queries), 1), 4)
+    report["max_rss_mb"] = _max_rss_mb()
+    return report
+
+
+def _bench_backend_process(db_path: str, backend: str, queries: List[Dict], ks: List[int]) -> Dict:
+    """
+    Worker entry point: ru_maxrss is a per-process high-water mark, so every
+    backend gets a fresh process and its peak isn't inherited from the last one.
+    """
+    return bench_backend(open_catalog(db_path), backend, queries, ks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark product retrieval on synthetic catalogs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--backends", nargs="+", default=["chroma", "numpy"], choices=["chroma", "numpy", "ivf"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 10])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default="./bench_data")
+    parser.add_argument("--keep", action="store_true", help="Reuse an already-built catalog of the same size")
+    parser.add_argument("--out", help="Result file (default: benchmarks/results/retrieval-<timestamp>.json)")
+    args = parser.parse_args()
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    run = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "sizes": []
+    }
+    for size in args.sizes:
+        print(f"=== Catalog of {size} SKUs ===")
+        db_path, labels, build = build_catalog(size, args.work_dir, args.seed, args.keep)
+        queries = generate_queries(labels, args.queries, args.seed)
+        entry = {"size": size, "queries": len(queries), "build": build, "backends": []}
+        for backend in args.backends:
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                result = pool.apply(_bench_backend_process, (db_path, backend, queries, args.k))
+            print(json.dumps(result))
+            entry["backends"].append(result)
+        run["sizes"].append(entry)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"retrieval-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
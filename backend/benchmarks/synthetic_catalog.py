@@ -0,0 +1,126 @@
+"""
+Synthetic product catalogs in the seed_db.py schema, plus labelled requirement
+queries, for the benchmarks. Everything is derived from a seed, so the same
+size and seed always produce the same catalog and queries.
+"""
+import json
+import random
+from typing import Dict, Iterator, List
+
+VOLTAGES = ["1.1kV", "3.3kV", "6.6kV", "11kV", "22kV", "33kV", "66kV"]
+INSULATIONS = ["XLPE", "PVC", "EPR", "LSZH"]
+ARMOURINGS = ["Strip", "Wire", "Unarmoured"]
+CORES = ["1", "2", "3", "3.5", "4", "7", "12", "19"]
+SIZES = ["1.5", "2.5", "4", "6", "10", "16", "25", "35", "50", "70", "95", "120", "150", "185", "240", "300", "400"]
+CONDUCTORS = ["copper", "aluminium"]
+CABLE_KINDS = ["Power Cable", "Control Cable", "Instrumentation Cable", "Feeder Cable"]
+
+SERVICES = [
+    ("Cloud Hosting", "Hosting", "Managed cloud hosting with monitoring, OS patching and uptime SLA"),
+    ("Portal Development", "Development", "Software development of web portals and dashboards"),
+    ("Annual Maintenance Contract", "Support", "Post-deployment maintenance, bug fixes and minor enhancements"),
+    ("Cable Laying & Jointing", "Installation", "Trenching, laying, jointing and termination of power cables"),
+    ("Type Testing", "Testing", "Third-party type tests and routine tests at accredited laboratories"),
+    ("Site Survey", "Survey", "Route survey and load study before installation"),
+]
+
+# Share of the catalog that is cables; the rest are services
+CABLE_SHARE = 0.9
+
+
+def _cable(rng: random.Random, idx: int) -> Dict:
+    voltage = rng.choice(VOLTAGES)
+    insulation = rng.choice(INSULATIONS)
+    armouring = rng.choice(ARMOURINGS)
+    cores = rng.choice(CORES)
+    size = rng.choice(SIZES)
+    conductor = rng.choice(CONDUCTORS)
+    kind = rng.choice(CABLE_KINDS)
+    armour_text = "unarmoured" if armouring == "Unarmoured" else f"galvanized steel {armouring.lower()} armour"
+    return {
+        "sku": f"CBL-{idx:07d}",
+        "name": f"{voltage} {insulation} {kind} {cores}C x {size}sqmm",
+        "details": f"{conductor.title()} conductor cable, {insulation} insulation, {armour_text}. Voltage: {voltage}.",
+        "category": "Cable",
+        "price": round(rng.uniform(50, 9000), 2),
+        "specs": {
+            "voltage": voltage,
+            "insulation": insulation,
+            "cores": cores,
+            "sqmm": size,
+            "armouring": armouring,
+        }
+    }
+
+
+def _service(rng: random.Random, idx: int) -> Dict:
+    name, kind, details = rng.choice(SERVICES)
+    duration = rng.choice(["6 Months", "1 Year", "3 Years"])
+    return {
+        "sku": f"SVC-{idx:07d}",
+        "name": f"{name} - {duration}",
+        "details": f"{details}. Term: {duration}.",
+        "category": "Service",
+        "price": round(rng.uniform(1000, 50000), 2),
+        "specs": {"type": kind, "duration": duration}
+    }
+
+
+def generate_catalog(size: int, seed: int = 0) -> Iterator[Dict]:
+    """
+    Yields `size` products one at a time, so million-SKU catalogs never sit in memory.
+    """
+    rng = random.Random(seed)
+    for idx in range(size):
+        yield _cable(rng, idx) if rng.random() < CABLE_SHARE else _service(rng, idx)
+
+
+def spec_signature(product: Dict) -> tuple:
+    """
+    Products with the same signature satisfy the same requirement equally well.
+    """
+    specs = product.get("specs", {})
+    if product.get("category") != "Cable":
+        return ("Service", specs.get("type"))
+    return ("Cable", specs.get("voltage"), specs.get("insulation"), specs.get("cores"),
+            specs.get("sqmm"), specs.get("armouring"))
+
+
+def write_catalog(path: str, size: int, seed: int = 0) -> Dict[tuple, List[str]]:
+    """
+    Writes the catalog as JSONL (the bulk ingestor's input) and returns the
+    relevance labels: SKUs grouped by spec signature.
+    """
+    labels: Dict[tuple, List[str]] = {}
+    with open(path, "w") as f:
+        for product in generate_catalog(size, seed):
+            f.write(json.dumps(product) + "\n")
+            labels.setdefault(spec_signature(product), []).append(product["sku"])
+    return labels
+
+
+def generate_queries(labels: Dict[tuple, List[str]], count: int, seed: int = 0) -> List[Dict]:
+    """
+    Requirement dicts shaped like extracted RFP items, each labelled with the
+    SKUs that exactly satisfy it. Wording differs from the catalog text, as in real tenders.
+    """
+    rng = random.Random(seed + 1)
+    signatures = sorted(labels, key=str)
+    queries = []
+    for _ in range(count):
+        signature = rng.choice(signatures)
+        if signature[0] == "Service":
+            name, kind, _ = next(s for s in SERVICES if s[1] == signature[1])
+            requirement = {"name": f"{name.lower()} services", "quantity": 1,
+                           "specs": {"voltage": "", "insulation": "", "cores": "", "armouring": ""}}
+        else:
+            _, voltage, insulation, cores, size, armouring = signature
+            armour_text = "unarmoured" if armouring == "Unarmoured" else f"{armouring.lower()} armoured"
+            requirement = {
+                "name": f"Supply of {voltage} {cores} core {size} sq.mm {insulation} {armour_text} cable",
+                "quantity": rng.choice([100, 500, 1000, 2500]),
+                "specs": {"voltage": voltage, "insulation": insulation, "cores": cores, "armouring": armouring},
+            }
+        requirement["relevant_skus"] = labels[signature]
+        queries.append(requirement)
+    return queries
@@ -0,0 +1,143 @@
+"""
+Tender listing parser benchmark: times each parser backend on generated
+listing pages of 1k to 100k rows against the original full-tree BeautifulSoup
+parse. Reports rows/s, time to first opportunity and, with --memory, peak
+Python memory. Run from backend/:
+
+    python -m benchmarks.tender_parser_bench --rows 1000 10000 100000
+
+Results are written as JSON to benchmarks/results/.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator
+from app.services import tender_parser
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+TITLES = [
+    "Supply of 11kV XLPE Cables for Rural Electrification",
+    "Annual Rate Contract for LT Control Cables",
+    "Turnkey Signalling Project (North Zone)",
+    "Supply, Laying and Jointing of 33kV Power Cables",
+    "Procurement of Instrumentation Cables for Thermal Plant",
+]
+
+
+def fixture_page(rows: int, seed: int = 0) -> str:
+    """
+    A CPPP-style listing page: header and navigation noise around one large table.
+    """
+    rng = random.Random(seed)
+    today = datetime.now()
+    dates = [(today + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(-10, 150)]
+    parts = ["<html><head><title>Latest Active Tenders</title></head><body>",
+             "<div id='nav'>" + "".join(f"<a href='/p/{i}'>Page {i}</a>" for i in range(200)) + "</div>",
+             "<table id='active-tenders'><tr><th>ID</th><th>Title</th><th>Published</th><th>Due</th><th>Link</th></tr>"]
+    for i in range(rows):
+        parts.append(
+            f'<tr class="tender-row"><td>rfp-{i:07d}</td><td>{rng.choice(TITLES)} - Lot {i}</td>'
+            f'<td>{rng.choice(dates[:10])}</td><td>{rng.choice(dates)}</td>'
+            f'<td><a href="https://eprocure.gov.in/rfp/{i}">View</a></td></tr>'
+        )
+    parts.append("</table></body></html>")
+    return "".join(parts)
+
+
+def legacy_parse(html: str) -> Iterator[Dict]:
+    """
+    The original approach: full html.parser tree, then find_all, then strptime per row.
+    """
+    from bs4 import BeautifulSoup
+
+    today = datetime.now()
+    soup = BeautifulSoup(html, "html.parser")
+    for row in soup.find_all("tr", class_="tender-row"):
+        cols = row.find_all("td")
+        if len(cols) < 5:
+            continue
+        row_data = (cols[0].text.strip(), cols[1].text.strip(), cols[2].text.strip(),
+                    cols[3].text.strip(), cols[4].find("a")["href"])
+        due_dt = datetime.strptime(row_data[3], "%Y-%m-%d")
+        built = tender_parser.build_opportunity(row_data, "bench", today)
+        # The original parsed each due date a second time when filtering
+        datetime.strptime(built[0]["due_date"], "%Y-%m-%d")
+        yield built[0], due_dt
+
+
+def measure(name: str, parse: Callable[[str], Iterator], html: str, memory: bool) -> Dict:
+    tender_parser.parse_date.cache_clear()
+    t0 = time.perf_counter()
+    first_ms = None
+    count = 0
+    for _ in parse(html):
+        if first_ms is None:
+            first_ms = (time.perf_counter() - t0) * 1000
+        count += 1
+    elapsed = time.perf_counter() - t0
+    result = {
+        "parser": name,
+        "rows": count,
+        "seconds": round(elapsed, 4),
+        "rows_per_second": round(count / elapsed, 1) if elapsed else None,
+        "first_row_ms": round(first_ms, 2) if first_ms is not None else None,
+    }
+    if memory:
+        # Separate pass: tracemalloc slows allocation-heavy parsers several-fold
+        tender_parser.parse_date.cache_clear()
+        tracemalloc.start()
+        for _ in parse(html):
+            pass
+        result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        tracemalloc.stop()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tender listing parser backends.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--skip-legacy-above", type=int, default=100000,
+                        help="Skip the full-tree baseline for pages larger than this")
+    parser.add_argument("--memory", action="store_true", help="Also measure peak Python memory (slow)")
+    parser.add_argument("--out", help="Result file (default: benchmarks/results/tender-parser-<timestamp>.json)")
+    args = parser.parse_args()
+
+    parsers = {"legacy_full_soup": legacy_parse}
+    for backend in tender_parser.BACKENDS:
+        if backend == "lxml" and not tender_parser.HAS_LXML:
+            continue
+        parsers[backend] = lambda html, b=backend: tender_parser.iter_opportunities(html, "bench", backend=b)
+
+    run = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "pages": []
+    }
+    for rows in args.rows:
+        html = fixture_page(rows)
+        entry = {"rows": rows, "page_mb": round(len(html.encode()) / 1e6, 2), "results": []}
+        print(f"=== {rows} rows ({entry['page_mb']} MB) ===")
+        for name, parse in parsers.items():
+            if name == "legacy_full_soup" and rows > args.skip_legacy_above:
+                continue
+            result = measure(name, parse, html, args.memory)
+            print(json.dumps(result))
+            entry["results"].append(result)
+        run["pages"].append(entry)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"tender-parser-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import os
+from app.services.catalog_ingest import CatalogIngestor
+from app.services.vector_store import ProductVectorDB
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a CSV / JSONL / Parquet product catalog into the vector DB.")
+    parser.add_argument("catalog", help="Path to the catalog file")
+    parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="Override format detection")
+    parser.add_argument("--batch-size", type=int, help="Rows per embed/upsert batch")
+    parser.add_argument("--workers", type=int, help="Batches embedded concurrently")
+    parser.add_argument("--checkpoint", default=".ingest_checkpoint.json", help="Resume checkpoint file")
+    parser.add_argument("--prune", action="store_true", help="Delete SKUs that are not in the catalog file")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args()
+
+    if args.restart:
+        if os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+
+    ingestor = CatalogIngestor(ProductVectorDB(), batch_size=args.batch_size, workers=args.workers,
+                               checkpoint_path=args.checkpoint)
+    stats = ingestor.run(args.catalog, fmt=args.format, prune=args.prune)
+    print(f"Done: {stats['products_upserted']} products from {stats['rows_read']} rows "
+          f"in {stats['seconds']}s ({stats['products_per_second']}/s): {stats['added']} added, "
+          f"{stats['updated']} updated, {stats['unchanged']} unchanged, {stats['deleted']} removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from app.services.vector_store import ProductVectorDB
+from app.services.price_book import PriceBook
 
 db = ProductVectorDB()
 
@@ -70,8 +71,19 @@ products = [
 ]
 
 print("Seeding database with products...")
-db.add_products(products)
-print("Seeding Complete!")
+# Never prune: the seed set is a handful of demo SKUs, not the full (bulk-ingested) catalog
+stats = db.sync_products(products, prune=False)
+print(f"Seeding Complete! {stats['added']} added, {stats['updated']} updated, "
+      f"{stats['unchanged']} unchanged, {stats['deleted']} removed.")
+
+# List prices go to the price book, which the Pricing Agent reads first.
+# Only SKUs without any price are seeded, so restarts never overwrite maintained prices.
+price_book = PriceBook()
+priced = price_book.priced_skus(p["sku"] for p in products)
+new_prices = {p["sku"]: p["price"] for p in products if p["sku"] not in priced}
+if new_prices:
+    price_book.set_prices(new_prices)
+print(f"Price book: {len(new_prices)} SKUs seeded, {len(priced)} already priced.")
 
 # Test Search
 # Test Search
@@ -0,0 +1,72 @@
+import hashlib
+import tempfile
+from chromadb.api.types import EmbeddingFunction
+from app.services.vector_store import ProductVectorDB
+
+
+class WordHashEmbedding(EmbeddingFunction):
+    """
+    Deterministic bag-of-words embedding, so the test runs without downloading a model.
+    """
+    def __init__(self):
+        pass
+
+    def __call__(self, input):
+        vectors = []
+        for text in input:
+            vector = [0.0] * 32
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 32] += 1.0
+            vectors.append(vector)
+        return vectors
+
+    @staticmethod
+    def name():
+        return "word-hash-test"
+
+    def get_config(self):
+        return {}
+
+    @staticmethod
+    def build_from_config(config):
+        return WordHashEmbedding()
+
+
+def cable(name="11kV XLPE Cable 3C x 95 sqmm", price=1000, specs=None):
+    return {"sku": "CAB-95", "name": name, "details": "Armoured power cable", "price": price,
+            "specs": specs if specs is not None else {"voltage": "11kV", "armour": "SWA"}}
+
+
+def stored_metadata(db):
+    return db.collection.get(ids=["CAB-95"], include=["metadatas"])["metadatas"][0]
+
+
+def test_dropped_spec_is_removed_on_metadata_update():
+    with tempfile.TemporaryDirectory() as path:
+        db = ProductVectorDB(backend="chroma", path=path, embedding_function=WordHashEmbedding())
+        db.sync_products([cable()])
+        assert stored_metadata(db)["spec_armour"] == "SWA"
+
+        # Same embedded text, so this goes through update() and keeps the stored vector
+        stats = db.sync_products([cable(price=1100, specs={"voltage": "11kV"})])
+        meta = stored_metadata(db)
+        assert stats["unchanged"] == 1, stats
+        assert "spec_armour" not in meta and meta["price"] == 1100, meta
+
+
+def test_dropped_spec_is_removed_on_reembed():
+    with tempfile.TemporaryDirectory() as path:
+        db = ProductVectorDB(backend="chroma", path=path, embedding_function=WordHashEmbedding())
+        db.sync_products([cable()])
+
+        # New name, so this goes through upsert() with a fresh embedding
+        stats = db.sync_products([cable(name="11kV XLPE Cable 3C x 120 sqmm", specs={"voltage": "11kV"})])
+        meta = stored_metadata(db)
+        assert stats["updated"] == 1, stats
+        assert "spec_armour" not in meta and meta["name"].endswith("120 sqmm"), meta
+
+
+if __name__ == "__main__":
+    test_dropped_spec_is_removed_on_metadata_update()
+    test_dropped_spec_is_removed_on_reembed()
+    print("CATALOG SYNC IS WORKING.")
@@ -0,0 +1,38 @@
+from app.services.technical_agent import TechnicalAgent
+
+XLPE_SPECS = {"voltage": "11kV", "insulation": "XLPE", "cores": "3", "sqmm": "95"}
+
+
+def line(quantity, name="11kV XLPE Cable 3C x 95 sqmm"):
+    return {"name": name, "quantity": quantity, "specs": dict(XLPE_SPECS)}
+
+
+def test_same_spec_lines_are_kept():
+    # Lot 1 and Lot 2 both ask for the same cable, in one chunk and in chunks far apart
+    merged = TechnicalAgent._merge_extracted_items([[line(500), line(1200)], [], [line(800)]])
+    assert [m["quantity"] for m in merged] == [500, 1200, 800], merged
+
+
+def test_overlap_duplicate_is_dropped():
+    # The last line of chunk 1 is repeated at the start of chunk 2 by the overlap
+    merged = TechnicalAgent._merge_extracted_items([[line(500), line(1200)], [line(1200), line(300)]])
+    assert [m["quantity"] for m in merged] == [500, 1200, 300], merged
+
+
+def test_overlap_fills_missing_quantity():
+    # The boundary cut the quantity off in chunk 1; chunk 2 saw the whole line
+    merged = TechnicalAgent._merge_extracted_items([[line(None)], [line(1200)]])
+    assert [m["quantity"] for m in merged] == [1200], merged
+
+
+def test_adjacent_lines_with_different_quantities_are_kept():
+    merged = TechnicalAgent._merge_extracted_items([[line(500)], [line(700)]])
+    assert [m["quantity"] for m in merged] == [500, 700], merged
+
+
+if __name__ == "__main__":
+    test_same_spec_lines_are_kept()
+    test_overlap_duplicate_is_dropped()
+    test_overlap_fills_missing_quantity()
+    test_adjacent_lines_with_different_quantities_are_kept()
+    print("EXTRACTION MERGE IS WORKING.")
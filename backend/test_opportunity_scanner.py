@@ -0,0 +1,76 @@
+import asyncio
+from app.services.opportunity_scanner import OpportunityScanner
+
+
+class FakeSalesAgent:
+    """
+    Stands in for SalesAgent: each scan takes `delay` seconds and returns its scan number.
+    """
+    def __init__(self, delay: float = 0.2, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.scans = 0
+
+    async def ascan_for_rfps(self):
+        self.scans += 1
+        scan_no = self.scans
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("portal unreachable")
+        return {"opportunities_found": 1, "opportunities": [{"id": f"scan-{scan_no}"}]}
+
+
+async def _single_flight():
+    agent = FakeSalesAgent()
+    scanner = OpportunityScanner(interval=3600, ttl=3600, sales_agent=agent)
+    results = await asyncio.gather(*(scanner.refresh() for _ in range(5)), scanner.latest())
+    assert agent.scans == 1, f"concurrent refreshes should share one scan, ran {agent.scans}"
+    assert all(r is results[0] for r in results)
+
+
+async def _stale_read():
+    agent = FakeSalesAgent(delay=0.1)
+    scanner = OpportunityScanner(interval=3600, ttl=0.05, sales_agent=agent)
+    first = await scanner.latest()
+    await asyncio.sleep(0.1)
+    assert scanner.is_stale()
+
+    # A stale read returns the old snapshot at once and refreshes in the background
+    stale = await scanner.latest()
+    assert stale is first and scanner.cache_info()["scan_in_progress"]
+    await scanner.latest()  # Still stale while the refresh runs: no second scan
+    await asyncio.sleep(0.2)
+    assert agent.scans == 2, f"expected one background refresh, ran {agent.scans - 1}"
+    assert scanner.snapshot["opportunities"][0]["id"] == "scan-2"
+    await scanner.stop()
+
+
+async def _first_scan_fails():
+    agent = FakeSalesAgent(delay=0.0, fail=True)
+    scanner = OpportunityScanner(interval=3600, ttl=3600, sales_agent=agent)
+    snapshot = await scanner.latest()
+    assert snapshot["opportunities"] == [] and snapshot["last_error"] == "portal unreachable"
+    assert scanner.snapshot is None
+
+    agent.fail = False
+    snapshot = await scanner.latest()
+    assert snapshot["opportunities_found"] == 1 and scanner.last_error is None
+
+
+def test_single_flight():
+    asyncio.run(_single_flight())
+
+
+def test_stale_read():
+    asyncio.run(_stale_read())
+
+
+def test_first_scan_fails():
+    asyncio.run(_first_scan_fails())
+
+
+if __name__ == "__main__":
+    test_single_flight()
+    test_stale_read()
+    test_first_scan_fails()
+    print("OPPORTUNITY SCANNER CACHE IS WORKING.")
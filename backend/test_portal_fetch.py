@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.sales_agent import SalesAgent
+from app.services.portal_fetcher import PortalFetcher
+
+# Local stand-in for the tender portals: each path is one portal with its own behaviour
+DELAYS = {"/cppp": 0.2, "/ntpc": 1.0, "/powergrid": 0.5, "/hung": 5.0}
+flaky_hits = {"count": 0}
+
+
+def fixture_page(prefix: str, rows: int) -> str:
+    due = (datetime.now() + timedelta(days=20)).strftime("%Y-%m-%d")
+    body = "".join(
+        f'<tr class="tender-row"><td>{prefix}-{i:04d}</td><td>Supply of 11kV XLPE Cable lot {i}</td>'
+        f'<td>2025-12-01</td><td>{due}</td><td><a href="http://portal/{prefix}/{i}">View</a></td></tr>'
+        for i in range(rows)
+    )
+    return f"<html><body><table>{body}</table></body></html>"
+
+
+class PortalHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/flaky":
+            flaky_hits["count"] += 1
+            if flaky_hits["count"] == 1:
+                self.send_response(503)
+                self.end_headers()
+                return
+        time.sleep(DELAYS.get(self.path, 0.0))
+        page = fixture_page(self.path.strip("/"), 50).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_concurrent_scan():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PortalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    urls = [f"{base}/cppp", f"{base}/ntpc", f"{base}/powergrid", f"{base}/flaky", f"{base}/hung"]
+    agent = SalesAgent(
+        target_urls=urls,
+        source_timeouts={f"{base}/hung": 1.5},
+        # Two 1.5s attempts on /hung would take over 3s; the deadline cuts the source off at 2s
+        fetcher=PortalFetcher(retries=1, backoff=0.1, deadline=2.0)
+    )
+    try:
+        result = agent.scan_for_rfps()
+    finally:
+        server.shutdown()
+
+    for fetch in result["fetch_report"]:
+        print(f"{fetch['url']}: ok={fetch['ok']} status={fetch['status']} attempts={fetch['attempts']} "
+              f"{fetch['elapsed_ms']} ms {fetch['error'] or ''}")
+    print(f"Scan took {result['scan_seconds']}s for {result['opportunities_found']} opportunities")
+
+    serial_time = sum(DELAYS.values())
+    hung = next(f for f in result["fetch_report"] if f["url"].endswith("/hung"))
+    assert not hung["ok"] and "Deadline" in hung["error"], hung
+    assert hung["elapsed_ms"] < 2500, "The per-source deadline should cover all retries"
+    assert result["opportunities_found"] == 200, "4 healthy portals x 50 rows expected"
+    assert result["scan_seconds"] < serial_time, "Scan should be bounded by the slowest portal, not the sum"
+    print("CONCURRENT PORTAL SCAN IS WORKING.")
+
+
+if __name__ == "__main__":
+    test_concurrent_scan()
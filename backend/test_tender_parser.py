@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+from app.services import tender_parser
+
+DUE = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")
+TITLES = [
+    "11kV XLPE केबल की आपूर्ति – Lot 1",
+    "LT Control Cables, est. ₹ 4.5 Cr — Zone Süd",
+    "Plain ASCII tender",
+]
+
+
+def fixture_page() -> str:
+    # No <meta charset>: the parser must not fall back to guessing Latin-1
+    rows = "".join(
+        f'<tr class="tender-row"><td>rfp-{i}</td><td>{title}</td><td>2025-12-01</td>'
+        f'<td>{DUE}</td><td><a href="https://portal/rfp/{i}">View</a></td></tr>'
+        for i, title in enumerate(TITLES)
+    )
+    return f"<html><body><div>सूचना</div><table>{rows}</table></body></html>"
+
+
+def parse(backend: str):
+    return [opp for opp, _ in tender_parser.iter_opportunities(fixture_page(), "portal", backend=backend)]
+
+
+def test_backends_agree_on_non_ascii_rows():
+    strainer = parse("strainer")
+    assert [opp["title"] for opp in strainer] == TITLES, strainer
+    if not tender_parser.HAS_LXML:
+        print("lxml not installed, only the strainer backend was checked.")
+        return
+    assert parse("lxml") == strainer
+
+
+if __name__ == "__main__":
+    test_backends_agree_on_non_ascii_rows()
+    print("TENDER PARSER BACKENDS AGREE.")